@@ -1,14 +1,220 @@
-from flask import Flask, jsonify
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
-from agent import real_news_tool_instance
+import metrics
+from news_tool import get_news_tool, module_path
+from refresher import NewsRefresher, build_snapshot, event_id
+from snapshot_store import SnapshotStore
+from structured_logging import configure_logging
+
+configure_logging()
 
 app = Flask(__name__)
 CORS(app)
 
+# How long the very first request waits for the initial refresh to finish
+FIRST_SNAPSHOT_TIMEOUT = float(os.getenv('NEWS_FIRST_SNAPSHOT_TIMEOUT', '30'))
+
+# Page size limits for /api/news queries against the article index
+DEFAULT_QUERY_LIMIT = 20
+MAX_QUERY_LIMIT = 100
+QUERY_PARAMS = ('category', 'source', 'since', 'limit', 'cursor')
+
+# Seconds between keep-alive comments on idle news streams
+STREAM_KEEPALIVE = float(os.getenv('NEWS_STREAM_KEEPALIVE', '15'))
+
+# An open stream holds a worker thread, so each one ends after this many seconds
+# (the browser reconnects and resumes with a delta) and a worker serves at most
+# this many at once; beyond that /api/news/stream answers 503 and clients poll
+STREAM_MAX_AGE = float(os.getenv('NEWS_STREAM_MAX_AGE', '300'))
+STREAM_MAX_CONNECTIONS = int(os.getenv('NEWS_STREAM_MAX_CONNECTIONS', '4'))
+
+_open_streams = 0
+_streams_lock = threading.Lock()
+metrics.REGISTRY.gauge(
+    'news_stream_connections', 'Open /api/news/stream connections in this worker'
+).callback = lambda: _open_streams
+
+# Expose /debug/profile for one-shot sampling profiles of a refresh
+ENABLE_PROFILER = os.getenv('NEWS_ENABLE_PROFILER', '').lower() in ('1', 'true', 'yes')
+
+# Multi-worker mode (e.g. gunicorn -w 4): every worker shares the snapshots in
+# this SQLite file and only the worker holding the refresher lease calls upstream
+SNAPSHOT_STORE_PATH = module_path(os.getenv('NEWS_SNAPSHOT_STORE'))
+snapshot_store = SnapshotStore(SNAPSHOT_STORE_PATH) if SNAPSHOT_STORE_PATH else None
+
+# Last snapshot and article index, kept on disk so a restart serves them at once;
+# set to an empty string to disable
+WARM_START_PATH = module_path(os.getenv('NEWS_WARM_START_PATH', 'news_warm_start.json'))
+
+news_tool_instance = get_news_tool()
+news_refresher = NewsRefresher(news_tool_instance, store=snapshot_store, warm_start_path=WARM_START_PATH or None)
+
+
+def snapshot_response(snapshot):
+    """Serve a snapshot body with validators so clients can revalidate cheaply"""
+    response = Response(snapshot.body, status=200, mimetype='application/json')
+    response.set_etag(snapshot.etag)
+    response.last_modified = snapshot.last_modified
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+def _parse_since(value):
+    """Epoch seconds or ISO 8601 (naive means UTC) to epoch seconds"""
+    try:
+        return float(value)
+    except ValueError:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+
+
+def query_news():
+    """Page of indexed articles matching the query string; served from memory only"""
+    args = request.args
+    try:
+        limit = min(max(int(args.get('limit', DEFAULT_QUERY_LIMIT)), 1), MAX_QUERY_LIMIT)
+        since = _parse_since(args['since']) if args.get('since') else None
+        index = news_tool_instance.article_index
+        items, next_cursor = index.query(
+            category=args.get('category') or None,
+            source=args.get('source') or None,
+            since=since,
+            limit=limit,
+            cursor=args.get('cursor') or None,
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Items are already JSON; only the envelope is serialized per request
+    body = '{"items":[%s],"count":%d,"next_cursor":%s}' % (','.join(items), len(items), json.dumps(next_cursor))
+    response = Response(body, status=200, mimetype='application/json')
+    # Same index version and query => same page
+    response.set_etag(hashlib.sha1(f'{index.version}?{request.query_string!r}'.encode()).hexdigest())
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
 @app.route('/api/news')
 def get_news():
-    news_json = real_news_tool_instance.execute()
-    return news_json, 200, {'Content-Type': 'application/json'}
+    # Started lazily so the debug reloader's parent process never refreshes
+    news_refresher.start()
+    snapshot = news_refresher.get_snapshot(timeout=FIRST_SNAPSHOT_TIMEOUT)
+    if any(param in request.args for param in QUERY_PARAMS):
+        return query_news()
+    if snapshot is None:
+        snapshot = build_snapshot(news_tool_instance.get_fallback_headlines())
+    return snapshot_response(snapshot)
+
+
+@app.route('/api/news/facets')
+def get_news_facets():
+    """Article counts per category, source and hour, for building dashboards"""
+    news_refresher.start()
+    return jsonify(news_tool_instance.article_index.facets())
+
+
+@app.route('/api/sources')
+def get_sources():
+    """Per-source health, circuit-breaker state and polling schedule"""
+    if snapshot_store is not None and not news_refresher.is_leader:
+        # Followers never fetch; report what the refreshing worker last recorded
+        return jsonify(snapshot_store.get_meta('sources') or [])
+    return jsonify(news_tool_instance.source_status())
+
+
+@app.route('/metrics')
+def get_metrics():
+    """Prometheus text exposition of pipeline metrics"""
+    return Response(metrics.REGISTRY.expose(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/debug/profile', methods=['GET', 'POST'])
+def debug_profile():
+    """POST arms a sampling profile of the next refresh; GET returns the last one as folded stacks"""
+    if not ENABLE_PROFILER:
+        return jsonify({'error': 'profiler disabled, set NEWS_ENABLE_PROFILER=1'}), 404
+    if request.method == 'POST':
+        news_refresher.profile_next_refresh()
+        return jsonify({'armed': True}), 202
+    profile = news_refresher.last_profile
+    if profile is None:
+        return jsonify({'error': 'no profile captured yet'}), 404
+    return Response(profile.collapsed() + '\n', mimetype='text/plain')
+
+
+def _claim_stream_slot():
+    global _open_streams
+    with _streams_lock:
+        if STREAM_MAX_CONNECTIONS and _open_streams >= STREAM_MAX_CONNECTIONS:
+            return False
+        _open_streams += 1
+        return True
+
+
+def _release_stream_slot():
+    global _open_streams
+    with _streams_lock:
+        _open_streams -= 1
+
+
+def _last_event_id():
+    """Event id of the snapshot the client already has, from Last-Event-ID (reconnects) or ?version="""
+    return request.headers.get('Last-Event-ID') or request.args.get('version') or None
+
+
+@app.route('/api/news/stream')
+def stream_news():
+    """Server-Sent Events: push the queue only when it changes.
+
+    The first event is a full "snapshot" (or a "delta" when the client
+    reconnects with an event id still in history); after that one event is
+    sent per new version. Event ids are "<version>-<etag prefix>", so an id
+    from before a server restart gets a full snapshot, never a delta against
+    the wrong base. Idle connections only receive a keep-alive comment.
+
+    Each connection holds a worker thread, so it closes after STREAM_MAX_AGE
+    seconds and the browser reconnects with its last event id. Past
+    STREAM_MAX_CONNECTIONS open streams the worker answers 503, which makes
+    the client fall back to polling /api/news.
+    """
+    news_refresher.start()
+    if not _claim_stream_slot():
+        response = jsonify({'error': 'too many open streams, poll /api/news instead'})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(int(STREAM_MAX_AGE))
+        return response
+    client_event_id = _last_event_id()
+
+    def events():
+        last_id = client_event_id
+        deadline = time.monotonic() + STREAM_MAX_AGE
+        yield "retry: 5000\n\n"
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            snapshot = news_refresher.wait_for_change(last_id, timeout=min(STREAM_KEEPALIVE, remaining))
+            if snapshot is None:
+                yield ": keepalive\n\n"
+                continue
+            event, data = news_refresher.stream_event(last_id, snapshot)
+            last_id = event_id(snapshot)
+            yield f"id: {last_id}\nevent: {event}\ndata: {data.decode('utf-8')}\n\n"
+
+    response = Response(events(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.call_on_close(_release_stream_slot)
+    return response
+
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    app.run(debug=True, threaded=True)
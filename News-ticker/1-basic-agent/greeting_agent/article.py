@@ -0,0 +1,118 @@
+import json
+import sys
+import time
+from datetime import datetime, timezone
+
+# Longest description kept per article; only categorization and dedup read it
+DESCRIPTION_LIMIT = 300
+
+TIMESTAMP_FORMAT = "%I:%M %p - %b %d"
+
+# Characters of an article's JSON that do not come from its fields: keys,
+# quotes, punctuation, the timestamp and publication date
+_JSON_FIXED_CHARS = 160
+
+
+def epoch_seconds(dt):
+    """Integer epoch seconds for a datetime; naive datetimes are UTC, like feed dates"""
+    if dt is None:
+        return int(time.time())
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+class Article:
+    """One news story, compact enough to keep thousands in memory.
+
+    Slotted, with the source and category strings interned (a few dozen
+    distinct values shared by every article) and the publication time as
+    integer epoch seconds. The index's JSON form is built on first use and
+    cached until the category or sources change; the ticker's payload dict
+    is only cached for the few articles that reach the ticker.
+    """
+
+    __slots__ = (
+        'key', 'title', 'url', 'guid', 'description', 'source', 'sources',
+        'category', 'published', 'score', '_payload', '_json',
+    )
+
+    def __init__(self, title, url='', description='', source='Unknown', published=None,
+                 guid='', category=None):
+        self.title = title = ' '.join(title.split())
+        self.url = url or ''
+        self.guid = guid or ''
+        self.description = (description or '')[:DESCRIPTION_LIMIT]
+        self.source = sys.intern(source or 'Unknown')
+        self.sources = (self.source,)
+        self.category = sys.intern(category) if category else None
+        self.published = int(published) if published is not None else int(time.time())
+        # Stable identity: GUID, then URL, then normalized title
+        self.key = self.guid or self.url or title.lower().strip()
+        self.score = None  # set by the ranker's score stage
+        self._payload = None
+        self._json = None
+
+    @property
+    def pub_date(self):
+        """Publication time as a naive UTC datetime"""
+        return datetime.fromtimestamp(self.published, timezone.utc).replace(tzinfo=None)
+
+    @property
+    def timestamp(self):
+        return self.pub_date.strftime(TIMESTAMP_FORMAT)
+
+    def set_category(self, category):
+        self.category = sys.intern(category)
+        self._payload = self._json = None
+
+    def set_sources(self, sources):
+        self.sources = tuple(sys.intern(source) for source in sources)
+        self._payload = self._json = None
+
+    def _fields(self):
+        return {
+            "title": self.title,
+            "timestamp": f"Released: {self.timestamp}",
+            "source": self.source,
+            "sources": list(self.sources),
+            "url": self.url,
+            "category": self.category or 'Technology',
+        }
+
+    def payload(self):
+        """Position-independent ticker fields, built once"""
+        if self._payload is None:
+            self._payload = self._fields()
+        return self._payload
+
+    def to_json(self):
+        """The article as returned by index queries, serialized once"""
+        if self._json is None:
+            # Not cached through payload(): most articles never reach the ticker
+            self._json = json.dumps({
+                "id": self.key,
+                **(self._payload or self._fields()),
+                "published": self.pub_date.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            })
+        return self._json
+
+    def size(self):
+        """Approximate bytes this article keeps alive, including its JSON form.
+
+        Interned names are shared and not counted. The JSON string every
+        indexed article caches is estimated from the fields rather than
+        built, so sizing an article does not serialize it. The size changes
+        with the sources, so callers that budget memory record the value
+        they added and subtract that same value later.
+        """
+        owned = {id(value): value for value in (self.title, self.url, self.guid, self.description, self.key)}
+        total = sys.getsizeof(self) + sys.getsizeof(self.sources)
+        total += sum(sys.getsizeof(value) for value in owned.values())
+        json_chars = _JSON_FIXED_CHARS + len(self.key) + len(self.title) + len(self.url) + sum(
+            len(source) + 4 for source in self.sources
+        ) + len(self.source) + len(self.category or 'Technology')
+        return total + sys.getsizeof('') + json_chars
+
+    def __repr__(self):
+        return f'Article({self.key!r}, {self.title[:40]!r})'
@@ -0,0 +1,196 @@
+import base64
+import bisect
+import itertools
+import sys
+import threading
+from collections import namedtuple
+
+# One indexed article. `payload` is the article's JSON text, returned to clients as is.
+IndexRecord = namedtuple('IndexRecord', ['key', 'published', 'seq', 'category', 'sources', 'payload'])
+
+
+def encode_cursor(entry):
+    neg_published, seq = entry
+    return base64.urlsafe_b64encode(f'{-neg_published!r}:{seq}'.encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError for anything it did not produce"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('ascii')
+        published, seq = raw.split(':')
+        return (-float(published), int(seq))
+    except (UnicodeDecodeError, ValueError, TypeError) as e:
+        raise ValueError(f"invalid cursor {cursor!r}") from e
+
+
+class ArticleIndex:
+    """Newest-first index of every published article, with secondary indexes.
+
+    Each posting list (all articles, one per category, one per source) is a
+    sorted list of (-published, seq) entries, so it is already in time order:
+    a `since` bound or a cursor is a bisect, and a page costs O(page size)
+    beyond that. Articles covered by several sources are listed under each.
+    Hourly buckets keep per-period counts for dashboards. The oldest
+    articles are evicted beyond `capacity`, or once their payloads take
+    more than `max_bytes`.
+    """
+
+    def __init__(self, capacity=1000, bucket_seconds=3600, max_bytes=None):
+        self.capacity = capacity
+        self.bucket_seconds = bucket_seconds
+        self.max_bytes = max_bytes
+        self.payload_bytes = 0
+        self.version = 0
+
+        self._lock = threading.RLock()
+        self._records = {}  # key -> IndexRecord
+        self._keys = {}  # seq -> key
+        self._all = []
+        self._by_category = {}
+        self._by_source = {}
+        self._buckets = {}  # bucket start (epoch seconds) -> article count
+        self._counter = itertools.count()
+
+    def add(self, key, published, category, sources, payload):
+        """Index an article, or update one already indexed; False if nothing changed"""
+        sources = tuple(sources)
+        with self._lock:
+            existing = self._records.get(key)
+            if existing is not None:
+                if (existing.category, existing.sources, existing.payload) == (category, sources, payload):
+                    return False
+                self._unlink(existing)
+                seq = existing.seq
+            else:
+                seq = next(self._counter)
+            record = IndexRecord(key, published, seq, category, sources, payload)
+            self._link(record)
+            while len(self._records) > self.capacity or (
+                self.max_bytes is not None and self.payload_bytes > self.max_bytes and len(self._records) > 1
+            ):
+                self._unlink(self._records[self._keys[self._all[-1][1]]])
+            self.version += 1
+            return True
+
+    def _link(self, record):
+        entry = (-record.published, record.seq)
+        self._records[record.key] = record
+        self._keys[record.seq] = record.key
+        bisect.insort(self._all, entry)
+        bisect.insort(self._by_category.setdefault(record.category, []), entry)
+        for source in record.sources:
+            bisect.insort(self._by_source.setdefault(source, []), entry)
+        bucket = self._bucket(record.published)
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+        self.payload_bytes += sys.getsizeof(record.payload)
+
+    def _unlink(self, record):
+        entry = (-record.published, record.seq)
+        del self._records[record.key]
+        del self._keys[record.seq]
+        self._discard(self._all, entry)
+        self._discard_posting(self._by_category, record.category, entry)
+        for source in record.sources:
+            self._discard_posting(self._by_source, source, entry)
+        bucket = self._bucket(record.published)
+        self._buckets[bucket] -= 1
+        if not self._buckets[bucket]:
+            del self._buckets[bucket]
+        self.payload_bytes -= sys.getsizeof(record.payload)
+
+    @staticmethod
+    def _discard(postings, entry):
+        i = bisect.bisect_left(postings, entry)
+        if i < len(postings) and postings[i] == entry:
+            del postings[i]
+
+    def _discard_posting(self, index, name, entry):
+        postings = index.get(name)
+        if postings is not None:
+            self._discard(postings, entry)
+            if not postings:
+                del index[name]
+
+    def _bucket(self, published):
+        return int(published // self.bucket_seconds * self.bucket_seconds)
+
+    def query(self, category=None, source=None, since=None, limit=20, cursor=None):
+        """Newest-first page of JSON payloads matching every given filter.
+
+        Returns (payloads, next_cursor); next_cursor is None on the last page.
+        `since` is an epoch timestamp, `cursor` a value from a previous page.
+        """
+        position = decode_cursor(cursor) if cursor else None
+        with self._lock:
+            # Walk the shortest matching posting list, check the other filter per record
+            candidates = []
+            if category is not None:
+                candidates.append(self._by_category.get(category, []))
+            if source is not None:
+                candidates.append(self._by_source.get(source, []))
+            postings = min(candidates, key=len) if candidates else self._all
+
+            start = bisect.bisect_right(postings, position) if position is not None else 0
+            matches = []
+            for entry in itertools.islice(postings, start, None):
+                if since is not None and -entry[0] < since:
+                    break
+                record = self._records[self._keys[entry[1]]]
+                if category is not None and record.category != category:
+                    continue
+                if source is not None and source not in record.sources:
+                    continue
+                matches.append((entry, record.payload))
+                # One extra match tells whether there is another page
+                if len(matches) > limit:
+                    break
+
+        next_cursor = encode_cursor(matches[limit - 1][0]) if len(matches) > limit else None
+        return [payload for _, payload in matches[:limit]], next_cursor
+
+    def facets(self):
+        """Article counts per category, per source and per time bucket"""
+        with self._lock:
+            return {
+                'total': len(self._records),
+                'payload_bytes': self.payload_bytes,
+                'categories': {name: len(postings) for name, postings in self._by_category.items()},
+                'sources': {name: len(postings) for name, postings in self._by_source.items()},
+                'buckets': sorted(self._buckets.items(), reverse=True),
+                'bucket_seconds': self.bucket_seconds,
+                'version': self.version,
+            }
+
+    def export(self):
+        """Records as JSON-ready lists, oldest first, for another process to load"""
+        with self._lock:
+            records = [self._records[self._keys[seq]] for _, seq in reversed(self._all)]
+        return [[r.key, r.published, r.category, list(r.sources), r.payload, r.seq] for r in records]
+
+    def load(self, records, version=None):
+        """Replace the contents with records produced by `export`.
+
+        Sequence numbers are kept, so cursors handed out by the exporting
+        process stay valid here (after a follower sync or a warm start).
+        """
+        with self._lock:
+            self._records, self._keys, self._all = {}, {}, []
+            self._by_category, self._by_source, self._buckets = {}, {}, {}
+            self.payload_bytes = 0
+            loaded = []
+            for record in records:
+                key, published, category, sources, payload = record[:5]
+                # Exports from before sequence numbers were saved get fresh ones below
+                seq = record[5] if len(record) > 5 else None
+                loaded.append([key, published, category, tuple(sources), payload, seq])
+            last = max((r[5] for r in loaded if r[5] is not None), default=-1)
+            self._counter = itertools.count(last + 1)
+            for key, published, category, sources, payload, seq in loaded:
+                if seq is None:
+                    seq = next(self._counter)
+                self._link(IndexRecord(key, published, seq, category, sources, payload))
+            self.version = version if version is not None else self.version + 1
+
+    def __len__(self):
+        return len(self._records)
@@ -0,0 +1,114 @@
+"""Benchmark: memory per retained article, dict records vs slotted Article.
+
+Builds the same articles from the recorded fixture feeds in both shapes and
+measures the traced allocations each set keeps alive: the old pipeline dict
+(with its cached ticker dict and index payload) and `Article` with its
+serialized JSON. Then feeds a long stream of articles through ArticleStore to
+show the history staying within its count and byte budgets.
+
+    python benchmarks/bench_article_memory.py
+"""
+import gc
+import os
+import time
+import tracemalloc
+
+from stub_feeds import load_fixture_feeds
+
+from article import Article, epoch_seconds
+from feed_parser import parse_fast
+from ingest import ArticleStore
+
+ARTICLES = int(os.getenv('BENCH_ARTICLES', '5000'))
+STREAM = int(os.getenv('BENCH_STREAM', '12000'))
+RETENTION = int(os.getenv('NEWS_RETENTION_MAX_ARTICLES', '5000'))
+RETENTION_BYTES = int(float(os.getenv('NEWS_RETENTION_MAX_MB', '2')) * 1024 * 1024)
+CATEGORIES = ['AI & Machine Learning', 'Cybersecurity', 'Gaming', 'Business Tech']
+
+
+def fixture_entries(count):
+    """`count` (title, link, description, pub_date, guid, source) tuples, each one unique"""
+    entries = []
+    for name, content in load_fixture_feeds().items():
+        entries.extend(entry + (name.split('.')[0],) for entry in parse_fast(content))
+    out = []
+    for i in range(count):
+        title, link, description, pub_date, guid, source = entries[i % len(entries)]
+        out.append((f'{title} #{i}', f'{link}?{i}', description, pub_date, f'{guid}-{i}' if guid else '', source))
+    return out
+
+
+def as_dict(entry, category):
+    """The record shape the pipeline used before Article"""
+    title, link, description, pub_date, guid, source = entry
+    item = {
+        'title': title,
+        'description': description,
+        'timestamp': pub_date.strftime("%I:%M %p - %b %d"),
+        'source': source,
+        'url': link,
+        'guid': guid,
+        'pub_date': pub_date,
+        'sources': [source],
+        'category': category,
+    }
+    item['_formatted'] = {
+        "title": item['title'],
+        "timestamp": f"Released: {item['timestamp']}",
+        "source": item['source'],
+        "sources": item['sources'],
+        "url": item['url'],
+        "category": item['category'],
+    }
+    payload = {"id": guid or link, **item['_formatted'], "published": pub_date.strftime('%Y-%m-%dT%H:%M:%SZ')}
+    return item, payload
+
+
+def as_article(entry, category):
+    title, link, description, pub_date, guid, source = entry
+    article = Article(title, url=link, description=description, source=source,
+                      published=epoch_seconds(pub_date), guid=guid, category=category)
+    return article, article.to_json()
+
+
+def retained_bytes(build, entries):
+    """Traced bytes kept alive by building every entry with `build`"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = [build(entry, CATEGORIES[i % len(CATEGORIES)]) for i, entry in enumerate(entries)]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return after - before
+
+
+def main():
+    entries = fixture_entries(ARTICLES)
+    print(f"{ARTICLES} articles from the fixture feeds")
+    baseline = None
+    for name, build in (('dict + payload dict', as_dict), ('Article + JSON', as_article)):
+        per_article = retained_bytes(build, entries) / ARTICLES
+        baseline = baseline or per_article
+        print(f"  {name:<22} {per_article:8.0f} B/article  ({per_article / baseline:.0%})")
+
+    print(f"\nstreaming {STREAM} articles into ArticleStore "
+          f"(max {RETENTION} articles, {RETENTION_BYTES / 1024 / 1024:.1f} MB)")
+    store = ArticleStore(max_seen=RETENTION, max_bytes=RETENTION_BYTES)
+    now = int(time.time())
+    stream = fixture_entries(STREAM)
+    for start in range(0, STREAM, STREAM // 4):
+        batch = stream[start:start + STREAM // 4]
+        store.ingest([
+            Article(title, url=link, description=description, source=source,
+                    published=now - (STREAM - start - i), guid=guid)
+            for i, (title, link, description, _, guid, source) in enumerate(batch)
+        ])
+        print(f"  after {start + len(batch):>6}: {len(store):>5} retained, "
+              f"{store.retained_bytes / 1024 / 1024:5.2f} MB, "
+              f"{store.retained_bytes / max(len(store), 1):.0f} B/article")
+
+
+if __name__ == '__main__':
+    main()
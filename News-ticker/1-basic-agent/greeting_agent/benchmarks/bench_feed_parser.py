@@ -0,0 +1,70 @@
+"""Benchmark: streaming feed parser vs feedparser on the recorded fixtures.
+
+For each fixture feed, times a full feedparser parse, the fast parser reading
+the whole document and the fast parser stopping after the newest
+FEED_MAX_ENTRIES entries, and measures peak traced allocations for each with
+tracemalloc. Also checks that both parsers agree on the fields the pipeline
+uses.
+
+    python benchmarks/bench_feed_parser.py
+"""
+import os
+import time
+import tracemalloc
+
+from stub_feeds import load_fixture_feeds
+
+from feed_parser import parse_fast, parse_with_feedparser
+
+LIMIT = int(os.getenv('FEED_MAX_ENTRIES', '10'))
+REPEAT = 20
+
+
+def best_time(func, content):
+    timings = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        func(content)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def peak_allocated(func, content):
+    tracemalloc.start()
+    try:
+        func(content)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def agreement(content):
+    """Share of entries where title, link, guid and date match feedparser"""
+    fast = parse_fast(content, LIMIT)
+    slow = parse_with_feedparser(content, LIMIT)
+    same = sum(
+        (a[0], a[1], a[3], a[4]) == (b[0], b[1], b[3], b[4])
+        for a, b in zip(fast, slow)
+    )
+    return same / max(len(slow), 1)
+
+
+def main():
+    parsers = [
+        ('feedparser', parse_with_feedparser),
+        ('fast, full document', lambda content: parse_fast(content)),
+        (f'fast, newest {LIMIT}', lambda content: parse_fast(content, LIMIT)),
+    ]
+    for name, content in load_fixture_feeds().items():
+        print(f"{name}: {len(content) / 1024:.0f} KB, agreement with feedparser {agreement(content):.0%}")
+        baseline = None
+        for label, func in parsers:
+            seconds = best_time(func, content)
+            peak = peak_allocated(func, content)
+            baseline = baseline or seconds
+            print(f"  {label:<22} {seconds * 1000:8.2f} ms  {baseline / seconds:5.1f}x  "
+                  f"peak alloc {peak / 1024:8.0f} KB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Benchmark: local keyword categorizer accuracy and latency.
+
+Runs LocalCategorizer over the labeled headlines in
+fixtures/labeled_headlines.json and reports agreement with the labels, how
+many articles clear the confidence threshold (and so would skip Gemini in
+hybrid mode), agreement on those, and per-article latency.
+
+    python benchmarks/bench_local_categorizer.py [min_confidence]
+"""
+import json
+import os
+import sys
+import time
+
+import stub_feeds  # noqa: F401  (puts the agent directory on sys.path)
+from local_categorizer import LocalCategorizer
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'labeled_headlines.json')
+
+
+def main():
+    threshold = float(sys.argv[1]) if len(sys.argv) > 1 else float(os.getenv('LOCAL_CATEGORY_MIN_CONFIDENCE', '0.5'))
+    with open(FIXTURE) as f:
+        labeled = json.load(f)
+
+    categorizer = LocalCategorizer()
+    results = [categorizer.categorize(item['title'], item['description']) for item in labeled]
+
+    agree = sum(category == item['category'] for item, (category, _) in zip(labeled, results))
+    confident = [(item, category) for item, (category, confidence) in zip(labeled, results) if confidence >= threshold]
+    confident_agree = sum(category == item['category'] for item, category in confident)
+
+    rounds = 200
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for item in labeled:
+            categorizer.categorize(item['title'], item['description'])
+    per_article = (time.perf_counter() - started) / (rounds * len(labeled))
+
+    print(f"labeled articles           {len(labeled)}")
+    print(f"overall agreement          {agree / len(labeled):.1%}")
+    print(f"confident (>= {threshold:.2f})       {len(confident) / len(labeled):.1%} of articles skip Gemini")
+    if confident:
+        print(f"agreement when confident   {confident_agree / len(confident):.1%}")
+    print(f"latency per article        {per_article * 1e6:.1f} µs")
+
+    for item, (category, confidence) in zip(labeled, results):
+        if category != item['category']:
+            print(f"  miss: {item['title'][:60]!r} -> {category} ({confidence}) expected {item['category']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark: upstream quota under concurrent refreshes and a short Gemini budget.
+
+Several callers (the refresher, the agent, API workers) asking for a
+refresh at the same moment used to run one pipeline each, every one of them
+spending a NewsAPI request and Gemini calls on the same articles. Now they
+share the refresh in flight, NewsAPI requests are spread over its daily
+budget, and Gemini quota goes to the articles the ticker shows before
+backfill, with the rest deferred on a provisional category and retried as
+tokens come back.
+
+Runs offline against the recorded fixture feeds and the fake clients, with
+deliberately tight budgets.
+
+    python benchmarks/bench_quota.py
+"""
+import os
+import tempfile
+import threading
+import time
+
+CALLERS = int(os.getenv('BENCH_CALLERS', '8'))
+REFRESHES = int(os.getenv('BENCH_REFRESHES', '6'))
+
+workdir = tempfile.mkdtemp(prefix='bench-quota-')
+os.environ.update({
+    'GOOGLE_API_KEY': 'benchmark',
+    'NEWS_API_KEY': '',  # the fake client is injected instead
+    'CATEGORY_CACHE_PATH': os.path.join(workdir, 'categories.db'),
+    'NEWS_QUOTA_PATH': os.path.join(workdir, 'quota.db'),
+    'CATEGORIZER_MODE': 'gemini',  # every article needs the model
+    'LOG_LEVEL': 'WARNING',
+    'NEWSAPI_DAILY_BUDGET': os.getenv('NEWSAPI_DAILY_BUDGET', '3'),
+    'NEWSAPI_PER_MINUTE': os.getenv('NEWSAPI_PER_MINUTE', '600'),
+    # One batch request for what the ticker shows, the other held in reserve for it
+    'GEMINI_DAILY_BUDGET': os.getenv('GEMINI_DAILY_BUDGET', '2'),
+    'GEMINI_BACKFILL_RESERVE': os.getenv('GEMINI_BACKFILL_RESERVE', '0.5'),
+    'GEMINI_PER_MINUTE': os.getenv('GEMINI_PER_MINUTE', '60'),
+})
+
+from stub_feeds import StubFeedServer, load_fixture_feeds
+
+from fakes import FakeGeminiModel, FakeNewsApiClient
+import metrics
+import news_tool
+from sources import SourceRegistry
+
+
+def outcomes(upstream):
+    counts = {}
+    for outcome in ('allowed', 'throttled', 'reserved', 'exhausted', 'rate_limited', 'coalesced'):
+        value = metrics.UPSTREAM_REQUESTS.value(upstream=upstream, outcome=outcome)
+        if value:
+            counts[outcome] = int(value)
+    return counts
+
+
+def main():
+    documents = load_fixture_feeds()
+    names = [name.split('.')[0] for name in documents]
+    with StubFeedServer({name: 0.05 for name in names},
+                        documents={name: content for name, content in zip(names, documents.values())}) as server:
+        tool = news_tool.NewsTool()
+        tool.source_registry = SourceRegistry.from_feeds(server.feed_list(), poll_interval=0, min_interval=0)
+        tool.newsapi_client = newsapi = FakeNewsApiClient(latency=0.2)
+        tool._gemini_model = gemini = FakeGeminiModel(latency=0.05, batch_latency=0.2)
+
+        print(f"{CALLERS} callers refreshing at once")
+        barrier = threading.Barrier(CALLERS)
+        results = []
+
+        def caller():
+            barrier.wait()
+            results.append(tool.execute())
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=caller) for _ in range(CALLERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        print(f"  {time.perf_counter() - started:.2f}s, {len(set(results))} distinct result(s)")
+        print(f"  pipelines run: {CALLERS - outcomes('refresh').get('coalesced', 0)}, "
+              f"NewsAPI calls: {newsapi.calls}, Gemini calls: {gemini.calls}")
+
+        visible = tool.ranking[:tool.max_news_items]
+        deferred_visible = sum(item.key in tool._deferred for item in visible)
+        print(f"  visible articles on a provisional category: {deferred_visible}/{len(visible)}")
+        print(f"  backlog deferred for Gemini quota: {len(tool._deferred)}")
+
+        print(f"\n{REFRESHES} more refreshes, 1s apart")
+        for n in range(REFRESHES):
+            time.sleep(1)
+            tool.execute()
+            print(f"  refresh {n + 1}: NewsAPI calls {newsapi.calls}, Gemini calls {gemini.calls}, "
+                  f"backlog {len(tool._deferred)}")
+
+        # A restarted process reads the spend back instead of starting a fresh day
+        restarted = news_tool.NewsTool()
+        print(f"  after a restart: NewsAPI {restarted.newsapi_scheduler.to_dict()['used_today']} used today, "
+              f"Gemini {restarted.gemini_scheduler.to_dict()['used_today']}")
+
+        # The next UTC day brings the Gemini budget back and the backlog drains
+        with tool.quota_ledger.update(news_tool.GEMINI_SOURCE) as state:
+            state['day'] -= 1
+        tool.execute()
+        print(f"  next day: Gemini calls {gemini.calls}, backlog {len(tool._deferred)}")
+
+        for scheduler in (tool.newsapi_scheduler, tool.gemini_scheduler):
+            quota = scheduler.to_dict()
+            print(f"\n{scheduler.name}: used {quota['used_today']}/{quota['daily_limit']} today, "
+                  f"outcomes {outcomes(scheduler.name)}")
+
+
+if __name__ == '__main__':
+    main()
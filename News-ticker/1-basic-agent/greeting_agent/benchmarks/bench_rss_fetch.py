@@ -0,0 +1,58 @@
+"""Benchmark: RSS refresh time tracks the slowest feed, not the sum of feeds.
+
+Serves eight local stub feeds with different injected latencies and times
+`fetch_from_rss` with a single worker (the old sequential behaviour) and with
+the default worker pool.
+
+    python benchmarks/bench_rss_fetch.py
+"""
+import time
+
+from stub_feeds import StubFeedServer
+
+import news_tool
+from sources import SourceRegistry
+
+LATENCIES = {
+    'fast-1': 0.05, 'fast-2': 0.05, 'fast-3': 0.1, 'fast-4': 0.1,
+    'medium-1': 0.3, 'medium-2': 0.3, 'slow-1': 0.8, 'stalled': 5.0,
+}
+
+
+def run(tool, feeds, workers, deadline):
+    # Fresh registry with no polling interval so every feed is due on each run
+    tool.source_registry = SourceRegistry.from_feeds(feeds, poll_interval=0, min_interval=0)
+    tool.rss_workers = workers
+    tool.rss_refresh_deadline = deadline
+    started = time.perf_counter()
+    items = tool.fetch_from_rss()
+    return time.perf_counter() - started, len(items)
+
+
+def main():
+    tool = news_tool.NewsTool()
+
+    with StubFeedServer(LATENCIES) as server:
+        feeds = server.feed_list()
+        tool.rss_feed_timeout = 10
+
+        total = sum(LATENCIES.values())
+        slowest_ok = max(v for k, v in LATENCIES.items() if k != 'stalled')
+        deadline = 2.0
+
+        sequential, n_seq = run(tool, feeds, workers=1, deadline=60)
+        concurrent, n_con = run(tool, feeds, workers=len(LATENCIES), deadline=60)
+        bounded, n_bnd = run(tool, feeds, workers=len(LATENCIES), deadline=deadline)
+
+    print(f"sum of feed latencies      {total:6.2f}s")
+    print(f"sequential (1 worker)      {sequential:6.2f}s  {n_seq} items")
+    print(f"concurrent                 {concurrent:6.2f}s  {n_con} items  (slowest feed {LATENCIES['stalled']:.2f}s)")
+    print(f"{f'concurrent, {deadline:.0f}s deadline':<27}{bounded:6.2f}s  {n_bnd} items  (slowest healthy feed {slowest_ok:.2f}s)")
+
+    totals = tool.transport.totals()
+    print(f"conditional GET            {totals['not_modified']}/{totals['requests']} not modified "
+          f"({totals['hit_rate']:.0%}), {totals['bytes_saved']} bytes saved")
+
+
+if __name__ == '__main__':
+    main()
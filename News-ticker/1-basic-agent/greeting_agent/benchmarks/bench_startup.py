@@ -0,0 +1,96 @@
+"""Benchmark: process startup and time to the first /api/news response.
+
+Each measurement runs in a fresh interpreter with no API keys configured:
+
+    import news_tool   the pipeline module the API imports
+    import agent       the ADK entry point (pulls in the ADK and genai)
+    import app         the Flask app
+    cold               first /api/news with no warm-start file: waits for a
+                       refresh against local stub feeds
+    warm               first /api/news with the file the cold run left behind
+
+    python benchmarks/bench_startup.py
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from stub_feeds import StubFeedServer
+
+FEEDS = {f'feed-{i:02d}': 0.2 for i in range(8)}
+REPEAT = 3
+
+
+def child(mode, feeds_path):
+    started = time.perf_counter()
+    if mode in ('news_tool', 'agent'):
+        __import__(mode)
+        print(json.dumps({'import_s': time.perf_counter() - started}))
+        return
+    import app as web
+    import_s = time.perf_counter() - started
+    if feeds_path:
+        from sources import SourceRegistry
+        with open(feeds_path) as f:
+            feeds = [tuple(feed) for feed in json.load(f)]
+        web.news_tool_instance.source_registry = SourceRegistry.from_feeds(feeds, poll_interval=0, min_interval=0)
+    started = time.perf_counter()
+    response = web.app.test_client().get('/api/news')
+    first_s = time.perf_counter() - started
+    items = len(response.get_json())
+    # Let a started refresh finish so the warm-start file is written
+    web.news_refresher.get_snapshot(timeout=60)
+    web.news_refresher.refresh()
+    web.news_refresher.stop(timeout=5)
+    print(json.dumps({'import_s': import_s, 'first_response_s': first_s, 'items': items,
+                      'status': response.status_code}))
+
+
+def run_child(mode, env, feeds_path=''):
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', mode, feeds_path],
+        env=env, capture_output=True, text=True, timeout=300
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{mode} failed:\n{proc.stderr[-4000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    with tempfile.TemporaryDirectory() as workdir, StubFeedServer(FEEDS) as server:
+        feeds_path = os.path.join(workdir, 'feeds.json')
+        with open(feeds_path, 'w') as f:
+            json.dump(server.feed_list(), f)
+        env = dict(os.environ)
+        env.update({
+            'GOOGLE_API_KEY': '',
+            'NEWS_API_KEY': '',
+            'CATEGORY_CACHE_PATH': os.path.join(workdir, 'categories.db'),
+            'NEWS_QUOTA_PATH': os.path.join(workdir, 'quota.db'),
+            'LOG_LEVEL': 'WARNING',
+        })
+
+        for mode in ('news_tool', 'agent'):
+            best = min(run_child(mode, env)['import_s'] for _ in range(REPEAT))
+            print(f"import {mode:<10} {best:7.3f}s")
+
+        for label in ('cold', 'warm'):
+            runs = []
+            for _ in range(REPEAT):
+                warm_path = os.path.join(workdir, 'warm.json')
+                if label == 'cold' and os.path.exists(warm_path):
+                    os.remove(warm_path)
+                runs.append(run_child('app', dict(env, NEWS_WARM_START_PATH=warm_path), feeds_path))
+            best = min(runs, key=lambda r: r['import_s'] + r['first_response_s'])
+            print(f"{label:<4} import app {best['import_s']:7.3f}s   first /api/news "
+                  f"{best['first_response_s'] * 1000:8.1f} ms  (HTTP {best['status']}, {best['items']} items)")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        child(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else '')
+    else:
+        main()
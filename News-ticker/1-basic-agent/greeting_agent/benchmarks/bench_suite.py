@@ -0,0 +1,363 @@
+"""Offline benchmark suite for the news pipeline.
+
+Every scenario runs against local stub feeds built from the recorded
+fixtures in fixtures/feeds, a fake NewsAPI client that replays
+fixtures/newsapi_everything.json and a fake Gemini model, so results do not
+depend on the network or on API quotas. Each scenario runs in a fresh
+interpreter (the stub server stays in this process) so import cost and peak
+RSS are measured per scenario.
+
+Scenarios:
+    cold_start     first refresh of a new process with an empty category cache;
+                   every article goes to the fake Gemini model
+    warm_refresh   later refreshes: 304s from every feed, cached categories
+    slow_source    one stalled feed, one failing and one flaky feed, 2s deadline
+    scale_500      500 feeds, 32 fetch workers
+    api_load       /api/news p50/p99 under concurrent clients
+
+Every feed is polled on every refresh (poll_interval=0), which is the worst
+case for the adaptive scheduler.
+
+    python benchmarks/bench_suite.py
+    python benchmarks/bench_suite.py -s cold_start -s warm_refresh --output results.json
+    python benchmarks/bench_suite.py --output new.json --compare baseline.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from stub_feeds import AGENT_DIR, StubFeedServer, load_fixture_feeds
+
+SCENARIOS = {
+    # The local engine is confident about every fixture headline, so these two
+    # send everything to Gemini to measure batching and the category cache
+    'cold_start': {
+        'feeds': 21, 'latency': (0.05, 0.25), 'warmup': 0, 'refreshes': 1,
+        'env': {'CATEGORIZER_MODE': 'gemini'}, 'expect_gemini': True,
+    },
+    'warm_refresh': {
+        'feeds': 21, 'latency': (0.05, 0.25), 'warmup': 1, 'refreshes': 5,
+        'env': {'CATEGORIZER_MODE': 'gemini'},
+    },
+    'slow_source': {
+        'feeds': 21, 'latency': (0.05, 0.25), 'warmup': 0, 'refreshes': 4,
+        'slow': {'feed-000': 8.0},
+        'failures': {'feed-001': 1.0, 'feed-002': 0.5},
+        'env': {'RSS_REFRESH_DEADLINE': '2'},
+    },
+    'scale_500': {
+        'feeds': 500, 'latency': (0.02, 0.2), 'warmup': 0, 'refreshes': 2,
+        'env': {'RSS_FETCH_WORKERS': '32', 'RSS_REFRESH_DEADLINE': '60'},
+    },
+    'api_load': {
+        'feeds': 21, 'latency': (0.05, 0.25), 'clients': 16, 'requests': 50,
+        'env': {'NEWS_REFRESH_INTERVAL': '2'},
+    },
+}
+
+# Headline numbers compared by --compare; all are "lower is better"
+TRACKED = ('refresh_first_s', 'refresh_median_s', 'import_s', 'peak_rss_mb', 'bytes_per_article',
+           'api_p50_ms', 'api_p99_ms')
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, math.ceil(pct / 100.0 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def feed_documents(names):
+    """Give each stub feed one of the recorded fixtures, rewritten so its stories are its own"""
+    fixtures = list(load_fixture_feeds().values())
+    documents = {}
+    for i, name in enumerate(names):
+        body = fixtures[i % len(fixtures)]
+        body = body.replace(b'.example.com', f'.{name}.example.com'.encode())
+        body = body.replace(b'<guid isPermaLink="false">', f'<guid isPermaLink="false">{name}-'.encode())
+        documents[name] = body.replace(b'<title>', f'<title>{name}: '.encode())
+    return documents
+
+
+def feed_latencies(names, scenario):
+    """Deterministic spread of latencies across the scenario's range"""
+    low, high = scenario['latency']
+    latencies = {name: low + (high - low) * ((i * 37) % 100) / 100.0 for i, name in enumerate(names)}
+    latencies.update(scenario.get('slow', {}))
+    return latencies
+
+
+# --- child process: runs one scenario against the stub server -------------
+
+def measure_refresh(tool, refresh):
+    import metrics
+    parse_before = metrics.PARSE_TIME.total()[0]
+    fetch_before = metrics.FETCH_LATENCY.total()[0]
+    transport_before = tool.transport.totals()
+    gemini_before = tool._gemini_model.calls
+    newsapi_before = tool.newsapi_client.calls
+
+    started = time.perf_counter()
+    refresh()
+    elapsed = time.perf_counter() - started
+
+    # The pipeline times its own stages (fetch, normalize, dedupe, ...)
+    stages = {stage: round(seconds, 4) for stage, seconds in tool.last_stage_timings.items()}
+    stages['other'] = round(max(0.0, elapsed - sum(stages.values())), 4)
+    transport = tool.transport.totals()
+    return {
+        'seconds': round(elapsed, 4),
+        'stages': stages,
+        # Summed over fetch threads, so these can exceed the wall time
+        'feed_fetch_total_s': round(metrics.FETCH_LATENCY.total()[0] - fetch_before, 4),
+        'feed_parse_total_s': round(metrics.PARSE_TIME.total()[0] - parse_before, 4),
+        'feed_requests': transport['requests'] - transport_before['requests'],
+        'feed_not_modified': transport['not_modified'] - transport_before['not_modified'],
+        'gemini_calls': tool._gemini_model.calls - gemini_before,
+        'newsapi_calls': tool.newsapi_client.calls - newsapi_before,
+    }
+
+
+def api_load(web, clients, requests_per_client):
+    """Hammer /api/news from `clients` threads; returns latency percentiles in ms"""
+    import requests
+    from werkzeug.serving import make_server
+
+    server = make_server('127.0.0.1', 0, web.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f'http://127.0.0.1:{server.server_port}/api/news'
+
+    def client(results, conditional):
+        session = requests.Session()
+        etag = None
+        for _ in range(requests_per_client):
+            headers = {'If-None-Match': etag} if conditional and etag else {}
+            started = time.perf_counter()
+            response = session.get(url, headers=headers)
+            results.append((time.perf_counter() - started) * 1000)
+            etag = response.headers.get('ETag', etag)
+
+    report = {}
+    try:
+        for mode, conditional in (('full', False), ('conditional', True)):
+            results = []
+            threads = [threading.Thread(target=client, args=(results, conditional)) for _ in range(clients)]
+            started = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - started
+            report[mode] = {
+                'requests': len(results),
+                'p50_ms': round(percentile(results, 50), 2),
+                'p99_ms': round(percentile(results, 99), 2),
+                'max_ms': round(max(results), 2),
+                'throughput_rps': round(len(results) / elapsed, 1),
+            }
+    finally:
+        server.shutdown()
+    return report
+
+
+def run_child(name, feeds_path):
+    scenario = SCENARIOS[name]
+    with open(feeds_path) as f:
+        feeds = [tuple(feed) for feed in json.load(f)]
+
+    started = time.perf_counter()
+    if scenario.get('clients'):
+        import app as web
+        tool = web.news_tool_instance
+    else:
+        import news_tool
+        tool = news_tool.news_tool_instance
+    import_s = time.perf_counter() - started
+
+    from fakes import FakeGeminiModel, FakeNewsApiClient
+    from sources import SourceRegistry
+    tool.source_registry = SourceRegistry.from_feeds(feeds, poll_interval=0, min_interval=0)
+    tool.newsapi_client = FakeNewsApiClient()
+    tool._gemini_model = FakeGeminiModel()
+
+    result = {'import_s': round(import_s, 4)}
+    if scenario.get('clients'):
+        refresher = web.news_refresher
+        result['first_refresh'] = measure_refresh(
+            tool, lambda: (refresher.start(), refresher.get_snapshot(timeout=120)))
+        result['api'] = api_load(web, scenario['clients'], scenario['requests'])
+        refresher.stop()
+    else:
+        for _ in range(scenario['warmup']):
+            measure_refresh(tool, tool.execute)
+        result['refreshes'] = [measure_refresh(tool, tool.execute) for _ in range(scenario['refreshes'])]
+        if scenario.get('expect_gemini') and not any(r['gemini_calls'] for r in result['refreshes']):
+            raise RuntimeError(f"{name} never reached the Gemini model; its categorization path went unmeasured")
+        result['breakers_open'] = sorted(
+            source['name'] for source in tool.source_status() if (source['health'] or {}).get('state') == 'open')
+    result['peak_rss_mb'] = peak_rss_mb()
+    # Memory owned by the retained article history, per article
+    store = tool.article_store
+    result['retained_articles'] = len(store)
+    result['bytes_per_article'] = round(store.retained_bytes / len(store)) if len(store) else None
+    return result
+
+
+# --- parent process: stub server, subprocesses, reporting -----------------
+
+def run_scenario(name, workdir):
+    scenario = SCENARIOS[name]
+    names = [f'feed-{i:03d}' for i in range(scenario['feeds'])]
+    with StubFeedServer(feed_latencies(names, scenario), documents=feed_documents(names),
+                        failures=scenario.get('failures')) as server:
+        feeds_path = os.path.join(workdir, f'{name}-feeds.json')
+        with open(feeds_path, 'w') as f:
+            json.dump(server.feed_list(), f)
+
+        env = dict(os.environ)
+        env.update({
+            'GOOGLE_API_KEY': 'benchmark',
+            'NEWS_API_KEY': '',  # the fake client is injected instead
+            'CATEGORY_CACHE_PATH': os.path.join(workdir, f'{name}-categories.db'),
+            'CATEGORIZER_MODE': 'hybrid',
+            'LOG_LEVEL': 'WARNING',
+            'NEWS_WARM_START_PATH': '',  # every scenario starts cold
+            # Measure pipeline cost, not quota: bench_quota.py covers that
+            'NEWSAPI_DAILY_BUDGET': '0',
+            'NEWSAPI_PER_MINUTE': '100000',
+            'GEMINI_DAILY_BUDGET': '0',
+            'GEMINI_PER_MINUTE': '100000',
+            'NEWS_QUOTA_PATH': '',
+        })
+        env.update(scenario.get('env', {}))
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', name, '--feeds', feeds_path],
+            env=env, capture_output=True, text=True, timeout=900
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"scenario {name} failed:\n{proc.stderr[-4000:]}")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        result['stub_server'] = {
+            'requests': server.requests, 'not_modified': server.not_modified, 'failed': server.failed,
+        }
+    return summarize(result)
+
+
+def summarize(result):
+    """Add the TRACKED headline numbers to a scenario result"""
+    refreshes = result.get('refreshes') or ([result['first_refresh']] if 'first_refresh' in result else [])
+    if refreshes:
+        result['refresh_first_s'] = refreshes[0]['seconds']
+        result['refresh_median_s'] = percentile([r['seconds'] for r in refreshes], 50)
+    if 'api' in result:
+        result['api_p50_ms'] = result['api']['full']['p50_ms']
+        result['api_p99_ms'] = result['api']['full']['p99_ms']
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=AGENT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Print changes against a previous results file; returns the regressions found"""
+    regressions = []
+    for name, current in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous is None:
+            continue
+        for key in TRACKED:
+            old, new = previous.get(key), current.get(key)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            flag = ''
+            if change > threshold:
+                flag = '  REGRESSION'
+                regressions.append((name, key, old, new))
+            print(f"{name:<14} {key:<18} {old:>10} -> {new:<10} {change:+7.1%}{flag}")
+    return regressions
+
+
+def print_summary(results):
+    print(f"{'scenario':<14} {'first(s)':>9} {'median(s)':>9} {'import(s)':>9} "
+          f"{'rss(MB)':>8} {'B/art':>6} {'p50(ms)':>8} {'p99(ms)':>8}")
+    for name, r in results['scenarios'].items():
+        cells = [r.get('refresh_first_s'), r.get('refresh_median_s'), r.get('import_s'),
+                 r.get('peak_rss_mb'), r.get('bytes_per_article'), r.get('api_p50_ms'), r.get('api_p99_ms')]
+        print(f"{name:<14} " + ' '.join(
+            f"{'-' if v is None else v:>{w}}" for v, w in zip(cells, (9, 9, 9, 8, 6, 8, 8))))
+        for refresh in r.get('refreshes', [])[:1]:
+            stages = ', '.join(f'{stage} {seconds:.3f}s' for stage, seconds in refresh['stages'].items())
+            print(f"{'':<14} stages: {stages}; gemini calls {refresh['gemini_calls']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('-s', '--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='scenario to run (repeatable, default: all)')
+    parser.add_argument('--output', help="write JSON results to this file ('-' for stdout)")
+    parser.add_argument('--compare', help='previous results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='relative slowdown reported as a regression (default 0.2)')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--feeds', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.feeds)))
+        return 0
+
+    results = {
+        'suite': 'news-pipeline',
+        'revision': git_revision(),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'scenarios': {},
+    }
+    with tempfile.TemporaryDirectory(prefix='news-bench-') as workdir:
+        for name in args.scenario or list(SCENARIOS):
+            print(f"running {name}...", file=sys.stderr)
+            results['scenarios'][name] = run_scenario(name, workdir)
+
+    if args.output == '-':
+        print(json.dumps(results, indent=2))
+    else:
+        print_summary(results)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
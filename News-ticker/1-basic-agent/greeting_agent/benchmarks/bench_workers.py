@@ -0,0 +1,95 @@
+"""Benchmark: upstream refreshes stay constant as worker processes are added.
+
+Starts N worker processes that share one SnapshotStore, each running a
+NewsRefresher around a tool that only counts its calls. Halfway through, the
+worker holding the refresher lease is killed to show another one taking
+over. Reports upstream refreshes and how far behind the newest snapshot each
+surviving worker is.
+
+    python benchmarks/bench_workers.py
+"""
+import multiprocessing
+import os
+import signal
+import tempfile
+import time
+
+# Short timings so a run takes seconds; set before refresher reads them
+os.environ.setdefault('NEWS_STORE_POLL_INTERVAL', '0.2')
+os.environ.setdefault('NEWS_LEADER_LEASE_TTL', '1.5')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+import stub_feeds  # noqa: F401  (puts the agent modules on sys.path)
+
+from refresher import NewsRefresher
+from snapshot_store import SnapshotStore
+
+INTERVAL = 1.0
+DURATION = 8.0
+
+
+class CountingTool:
+    """Stands in for NewsTool: each execute() is one upstream refresh"""
+
+    def __init__(self, counter):
+        self.counter = counter
+
+    def execute(self):
+        with self.counter.get_lock():
+            self.counter.value += 1
+            n = self.counter.value
+        time.sleep(0.05)
+        return [{'id': '1', 'title': f'Refresh {n}', 'url': f'https://example.com/{n}'}]
+
+
+def worker(path, counter, versions, index):
+    refresher = NewsRefresher(CountingTool(counter), interval=INTERVAL, store=SnapshotStore(path))
+    refresher.start()
+    while True:
+        time.sleep(0.1)
+        if refresher.snapshot is not None:
+            versions[index] = refresher.snapshot.version
+
+
+def run(workers):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'snapshots.db')
+        store = SnapshotStore(path)
+        counter = multiprocessing.Value('i', 0)
+        versions = multiprocessing.Array('i', workers)
+        processes = [
+            multiprocessing.Process(target=worker, args=(path, counter, versions, i), daemon=True)
+            for i in range(workers)
+        ]
+        for p in processes:
+            p.start()
+
+        time.sleep(DURATION / 2)
+        killed = None
+        holder = store.lease_holder()
+        if workers > 1 and holder:
+            pid = int(holder.rsplit(':', 1)[1])
+            os.kill(pid, signal.SIGKILL)
+            killed = next(i for i, p in enumerate(processes) if p.pid == pid)
+        time.sleep(DURATION / 2)
+
+        latest = store.latest_version()
+        lag = max(latest - versions[i] for i in range(workers) if i != killed)
+        for p in processes:
+            if p.is_alive():
+                p.terminate()
+            p.join()
+        return counter.value, latest, lag, killed is not None
+
+
+def main():
+    print(f"refresh interval {INTERVAL:.1f}s, run {DURATION:.0f}s; "
+          f"a single process would refresh ~{DURATION / INTERVAL:.0f} times")
+    for workers in (1, 2, 4, 8):
+        refreshes, latest, lag, failover = run(workers)
+        print(f"{workers} worker(s): {refreshes:3d} upstream refreshes, latest version {latest}, "
+              f"max follower lag {lag} version(s){', leader killed mid-run' if failover else ''}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Offline stand-ins for the Gemini and NewsAPI clients used by NewsTool.
+
+Both sleep for a configurable latency so benchmarks see realistic wall-clock
+cost, and count calls so a run can report how often each upstream was hit.
+"""
+import json
+import os
+import re
+import threading
+import time
+
+from stub_feeds import FIXTURES_DIR
+
+from local_categorizer import LocalCategorizer
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGeminiModel:
+    """Answers categorization prompts like gemini-1.5-flash would, without the network.
+
+    Categories come from the local keyword engine (falling back to
+    `default`), so answers are deterministic. Batch prompts, recognised by
+    their JSON response type, get a JSON array of {"id", "category"} objects,
+    one per numbered article.
+    """
+
+    def __init__(self, latency=0.4, batch_latency=0.8, default='Innovation'):
+        self.latency = latency
+        self.batch_latency = batch_latency
+        self.default = default
+        self.categorizer = LocalCategorizer()
+        self.calls = 0
+        self.batch_calls = 0
+        self._lock = threading.Lock()
+
+    def _category(self, title):
+        category, _ = self.categorizer.categorize(title, '')
+        return category or self.default
+
+    def generate_content(self, prompt, generation_config=None):
+        titles = re.findall(r'(?:(\d+)\. )?Title: (.*)', prompt)
+        batch = bool(generation_config) and generation_config.get('response_mime_type') == 'application/json'
+        with self._lock:
+            self.calls += 1
+            self.batch_calls += batch
+        time.sleep(self.batch_latency if batch else self.latency)
+        if batch:
+            return FakeResponse(json.dumps([
+                {'id': int(number), 'category': self._category(title.strip())} for number, title in titles
+            ]))
+        return FakeResponse(self._category(titles[0][1].strip() if titles else ''))
+
+
+class FakeNewsApiClient:
+    """Serves the recorded NewsAPI /v2/everything response from fixtures"""
+
+    def __init__(self, latency=0.3, path=None):
+        self.latency = latency
+        with open(path or os.path.join(FIXTURES_DIR, 'newsapi_everything.json')) as f:
+            self.response = json.load(f)
+        self.calls = 0
+
+    def get_everything(self, **params):
+        self.calls += 1
+        time.sleep(self.latency)
+        return json.loads(json.dumps(self.response))
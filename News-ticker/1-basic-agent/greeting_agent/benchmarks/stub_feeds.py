@@ -0,0 +1,147 @@
+"""Local HTTP server that serves RSS/Atom feeds with injected latency and failures.
+
+Every path of the form /feed/<name> returns a feed document: a generated RSS
+feed, or the bytes given for that name in `documents` (e.g. one of the
+recorded fixtures). The latency for a feed is looked up in the `latencies`
+mapping passed to StubFeedServer, so a benchmark can make one feed slow and
+leave the others fast. `failures` maps a feed to the share of requests that
+should answer HTTP 500. Responses carry an ETag and honour If-None-Match
+with a 304, like most real feed hosts.
+"""
+import hashlib
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+# Make the agent modules importable when a benchmark is run as a script
+AGENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if AGENT_DIR not in sys.path:
+    sys.path.insert(0, AGENT_DIR)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def load_fixture_feeds():
+    """Recorded feed documents from fixtures/feeds, keyed by file name without extension"""
+    feeds_dir = os.path.join(FIXTURES_DIR, 'feeds')
+    documents = {}
+    for filename in sorted(os.listdir(feeds_dir)):
+        if filename.endswith('.xml'):
+            with open(os.path.join(feeds_dir, filename), 'rb') as f:
+                documents[filename[:-4]] = f.read()
+    return documents
+
+
+def make_rss(name, items=20, start=None):
+    """Build an RSS 2.0 document with `items` entries, newest first"""
+    start = start or datetime.now(timezone.utc)
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<rss version="2.0"><channel>',
+        f'<title>{escape(name)}</title><link>https://example.com/{escape(name)}</link>',
+        '<description>Stub feed</description>',
+    ]
+    for i in range(items):
+        published = format_datetime(start - timedelta(minutes=7 * i))
+        parts.append(
+            '<item>'
+            f'<title>{escape(name)} story {i}: new chip speeds up machine learning</title>'
+            f'<link>https://example.com/{escape(name)}/{i}</link>'
+            f'<guid>https://example.com/{escape(name)}/{i}</guid>'
+            f'<description>Article {i} from {escape(name)} about software and hardware.</description>'
+            f'<pubDate>{published}</pubDate>'
+            '</item>'
+        )
+    parts.append('</channel></rss>')
+    return '\n'.join(parts).encode('utf-8')
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that give up at their deadline close the socket mid-response
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StubFeedServer:
+    """Serve stub feeds on localhost from a background thread"""
+
+    def __init__(self, latencies, items=20, documents=None, failures=None, seed=0):
+        self.latencies = dict(latencies)
+        documents = documents or {}
+        self.documents = {
+            name: documents[name] if name in documents else make_rss(name, items)
+            for name in self.latencies
+        }
+        self.failures = dict(failures or {})
+        self.requests = 0
+        self.not_modified = 0
+        self.failed = 0
+        # Seeded so a failure-injection run is repeatable
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                name = self.path.rstrip('/').rsplit('/', 1)[-1]
+                with server._lock:
+                    server.requests += 1
+                    fail = server._random.random() < server.failures.get(name, 0.0)
+                    if fail:
+                        server.failed += 1
+                if name not in server.documents:
+                    self.send_error(404)
+                    return
+                time.sleep(server.latencies[name])
+                if fail:
+                    self.send_error(500)
+                    return
+                body = server.documents[name]
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                if self.headers.get('If-None-Match') == etag:
+                    with server._lock:
+                        server.not_modified += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Type', 'application/atom+xml' if b'<feed' in body[:200]
+                                 else 'application/rss+xml')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = _QuietServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def feed_list(self):
+        """Feeds as (url, name) pairs, ready for SourceRegistry.from_feeds"""
+        return [(f'{self.base_url}/feed/{name}', name) for name in self.latencies]
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,157 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+try:
+    from . import metrics
+except ImportError:
+    import metrics
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    """Lower-case, strip HTML tags and collapse whitespace"""
+    text = _TAG_RE.sub(' ', text or '')
+    return _SPACE_RE.sub(' ', text).strip().lower()
+
+
+def content_key(title, description=''):
+    """Content address for an article: hash of its normalized title and description"""
+    normalized = normalize_text(title) + '\n' + normalize_text(description)
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+class CategoryCache:
+    """On-disk cache of article categories with TTL and LRU eviction.
+
+    Entries are keyed by `content_key`, so the same story seen again (on the
+    next refresh or after a restart) is never sent to the model twice.
+
+    A hit only records its use time in memory; the times are written in one
+    transaction by the next `put`, or once `touch_batch` hits have piled up,
+    so lookups never commit. The entry count is kept as a running total,
+    recounted when expired entries are swept (every `sweep_interval`
+    seconds). Hits, misses and evictions go to metrics.CATEGORY_CACHE_*.
+    """
+
+    def __init__(self, path, ttl=7 * 24 * 3600, max_entries=10000, touch_batch=256, sweep_interval=3600):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.touch_batch = touch_batch
+        self.sweep_interval = sweep_interval
+
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._size = 0
+        self._touched = {}  # key -> last use not yet written
+        self._next_sweep = 0.0
+
+    def _db(self):
+        """This process's connection; a connection inherited across fork is never reused"""
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            with conn:
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS categories ('
+                    ' key TEXT PRIMARY KEY,'
+                    ' category TEXT NOT NULL,'
+                    ' created_at REAL NOT NULL,'
+                    ' last_used REAL NOT NULL)'
+                )
+                conn.execute('CREATE INDEX IF NOT EXISTS categories_last_used ON categories (last_used)')
+            self._conn, self._pid = conn, os.getpid()
+            self._size = conn.execute('SELECT COUNT(*) FROM categories').fetchone()[0]
+            self._touched = {}
+        return self._conn
+
+    def get(self, title, description=''):
+        """Return the cached category, or None on a miss or expired entry"""
+        key = content_key(title, description)
+        now = time.time()
+        with self._lock:
+            conn = self._db()
+            row = conn.execute(
+                'SELECT category, created_at FROM categories WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or (self.ttl and now - row[1] > self.ttl):
+                metrics.CATEGORY_CACHE_LOOKUPS.inc(result='miss')
+                if row is not None:
+                    with conn:
+                        conn.execute('DELETE FROM categories WHERE key = ?', (key,))
+                    self._size -= 1
+                    self._touched.pop(key, None)
+                    metrics.CATEGORY_CACHE_EVICTIONS.inc()
+                return None
+            metrics.CATEGORY_CACHE_LOOKUPS.inc(result='hit')
+            self._touched[key] = now
+            if len(self._touched) >= self.touch_batch:
+                with conn:
+                    self._flush_touched(conn)
+            return row[0]
+
+    def put(self, title, description, category):
+        key = content_key(title, description)
+        now = time.time()
+        with self._lock:
+            conn = self._db()
+            with conn:
+                inserted = conn.execute(
+                    'INSERT OR IGNORE INTO categories (key, category, created_at, last_used) VALUES (?, ?, ?, ?)',
+                    (key, category, now, now)
+                ).rowcount
+                if inserted:
+                    self._size += 1
+                else:
+                    conn.execute(
+                        'UPDATE categories SET category = ?, created_at = ?, last_used = ? WHERE key = ?',
+                        (category, now, now, key)
+                    )
+                self._touched.pop(key, None)
+                self._flush_touched(conn)
+                self._evict(conn, now)
+
+    def _flush_touched(self, conn):
+        if self._touched:
+            conn.executemany(
+                'UPDATE categories SET last_used = ? WHERE key = ?',
+                [(used, key) for key, used in self._touched.items()]
+            )
+            self._touched = {}
+
+    def _evict(self, conn, now):
+        """Sweep expired entries now and then, and least recently used ones above max_entries"""
+        if now >= self._next_sweep:
+            self._next_sweep = now + self.sweep_interval
+            if self.ttl:
+                expired = conn.execute('DELETE FROM categories WHERE created_at < ?', (now - self.ttl,)).rowcount
+                metrics.CATEGORY_CACHE_EVICTIONS.inc(max(expired, 0))
+            # Other processes write to the same file; resynchronize the running count
+            self._size = conn.execute('SELECT COUNT(*) FROM categories').fetchone()[0]
+        overflow = self._size - self.max_entries
+        if overflow > 0:
+            evicted = conn.execute(
+                'DELETE FROM categories WHERE key IN '
+                '(SELECT key FROM categories ORDER BY last_used ASC LIMIT ?)', (overflow,)
+            ).rowcount
+            self._size -= max(evicted, 0)
+            metrics.CATEGORY_CACHE_EVICTIONS.inc(max(evicted, 0))
+
+    def __len__(self):
+        with self._lock:
+            self._db()
+            return self._size
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                with self._conn:
+                    self._flush_touched(self._conn)
+                self._conn.close()
+            self._conn = None
@@ -0,0 +1,202 @@
+import random
+import re
+import zlib
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_WORD_RE = re.compile(r"[A-Za-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have how in is it its new of on or s says
+that the their this to was what when why will with you your after over into than
+now more about just here heres get gets out up all can could would we it's
+""".split())
+
+# Names that open headlines often enough that their capital letter says nothing
+KNOWN_ENTITIES = frozenset("""
+adobe airbnb alibaba amazon amd android anthropic apple arm asus aws azure
+baidu broadcom bytedance chrome cisco claude cloudflare copilot dell deepmind
+facebook gemini github google huawei ibm instagram intel linux meta microsoft
+mistral netflix nintendo nvidia openai oracle pixel playstation qualcomm
+reddit salesforce samsung sony spacex steam tesla tiktok tsmc uber valve
+whatsapp windows xbox xiaomi youtube
+""".split())
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def content_words(text):
+    """Lower-cased words minus stopwords; numbers are kept, since Pixel 8 is not Pixel 9"""
+    return [
+        token for token in _TOKEN_RE.findall(text.lower())
+        if token not in STOPWORDS and (len(token) > 1 or token.isdigit())
+    ]
+
+
+def shingles(title):
+    """Content words of a headline.
+
+    Single words rather than word pairs: outlets reword the same story
+    ("launches" / "rolls out"), and one changed word breaks two pairs.
+    Headlines that share their vocabulary but not their subject are told
+    apart by `key_terms` instead.
+    """
+    return set(content_words(title))
+
+
+def key_terms(title):
+    """Numbers, versions and names in a headline.
+
+    A word is a name when it is a known entity, has a digit or a capital
+    past its first letter (GPT-5, iOS, OpenAI, AMD), or is capitalized
+    mid-sentence in a sentence-case headline. In Title Case every word is
+    capitalized, so there only the first three kinds count.
+    """
+    words = [word for word in _WORD_RE.findall(title) if word.lower() not in STOPWORDS]
+    plain = [word for word in words[1:] if word[1:].islower()]
+    title_case = sum(word[0].isupper() for word in plain) > len(plain) / 2
+    terms = set()
+    for position, word in enumerate(words):
+        lower = word.lower()
+        if (lower in KNOWN_ENTITIES
+                or any(char.isdigit() for char in word)
+                or any(char.isupper() for char in word[1:])
+                or (position and not title_case and word[0].isupper())):
+            terms.add(lower)
+    return frozenset(terms)
+
+
+class StoryCluster:
+    """One story and every source that covered it"""
+
+    __slots__ = ('id', 'representative', 'members', 'sources', 'signature', 'key_terms')
+
+    def __init__(self, cluster_id, key, item, signature):
+        self.id = cluster_id
+        self.representative = item
+        self.members = [key]
+        self.sources = [item.source]
+        self.signature = signature
+        self.key_terms = key_terms(item.title)
+
+
+class StoryClusterer:
+    """Groups near-duplicate stories using MinHash signatures and an LSH index.
+
+    Each article is reduced to a `num_perm` MinHash signature of its
+    headline words. The signature is split into `bands` bands; articles
+    sharing any band bucket become candidates, and a candidate joins the
+    same cluster only if its estimated Jaccard similarity reaches
+    `threshold`, it was published within `window` seconds of the cluster's
+    representative, and neither headline names a number or entity the other
+    lacks. Lookups touch only the handful of articles that share a bucket,
+    not the whole history.
+    """
+
+    def __init__(self, num_perm=64, bands=32, threshold=0.5, window=48 * 3600, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.window = window
+
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        self._buckets = [{} for _ in range(bands)]  # band -> {band hash: set(cluster id)}
+        self._clusters = {}  # cluster id -> StoryCluster
+        self._cluster_of = {}  # article key -> cluster id
+        self._next_id = 1
+
+    def signature(self, tokens):
+        hashes = [zlib.crc32(token.encode('utf-8')) for token in tokens]
+        if not hashes:
+            return None
+        return tuple(
+            min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+            for a, b in self._perms
+        )
+
+    def _bands(self, signature):
+        rows = self.rows
+        return [hash(signature[i * rows:(i + 1) * rows]) for i in range(self.bands)]
+
+    def similarity(self, sig_a, sig_b):
+        """Estimated Jaccard similarity of two signatures"""
+        return sum(x == y for x, y in zip(sig_a, sig_b)) / self.num_perm
+
+    def find(self, signature, item=None):
+        """Best matching cluster for a signature (and the article it came from), or None"""
+        candidates = set()
+        for band, band_hash in enumerate(self._bands(signature)):
+            candidates.update(self._buckets[band].get(band_hash, ()))
+        terms = key_terms(item.title) if item is not None else None
+        best, best_score = None, self.threshold
+        for cluster_id in candidates:
+            cluster = self._clusters[cluster_id]
+            if item is not None and (
+                abs(item.published - cluster.representative.published) > self.window
+                # Each naming something the other does not ("iOS 18.1" / "iOS 18.2",
+                # "Nvidia earnings" / "AMD earnings") means different stories
+                or (terms - cluster.key_terms and cluster.key_terms - terms)
+            ):
+                continue
+            score = self.similarity(signature, cluster.signature)
+            if score >= best_score:
+                best, best_score = cluster, score
+        return best
+
+    def add(self, key, item):
+        """Place an article in a cluster; return (cluster, is_new_cluster)"""
+        if key in self._cluster_of:
+            return self._clusters[self._cluster_of[key]], False
+
+        signature = self.signature(shingles(item.title))
+        if signature is None:
+            # Nothing to compare on; keep the article as its own story
+            cluster = StoryCluster(self._next_id, key, item, None)
+            self._next_id += 1
+            self._clusters[cluster.id] = cluster
+            self._cluster_of[key] = cluster.id
+            return cluster, True
+
+        cluster = self.find(signature, item)
+        if cluster is not None:
+            cluster.members.append(key)
+            source = item.source
+            if source not in cluster.sources:
+                cluster.sources.append(source)
+            self._cluster_of[key] = cluster.id
+            return cluster, False
+
+        cluster = StoryCluster(self._next_id, key, item, signature)
+        self._next_id += 1
+        self._clusters[cluster.id] = cluster
+        self._cluster_of[key] = cluster.id
+        for band, band_hash in enumerate(self._bands(signature)):
+            self._buckets[band].setdefault(band_hash, set()).add(cluster.id)
+        return cluster, True
+
+    def remove(self, key):
+        """Forget an article; drop its cluster once no members remain"""
+        cluster_id = self._cluster_of.pop(key, None)
+        if cluster_id is None:
+            return
+        cluster = self._clusters[cluster_id]
+        cluster.members.remove(key)
+        if cluster.members:
+            return
+        del self._clusters[cluster_id]
+        if cluster.signature is not None:
+            for band, band_hash in enumerate(self._bands(cluster.signature)):
+                bucket = self._buckets[band].get(band_hash)
+                if bucket is not None:
+                    bucket.discard(cluster_id)
+                    if not bucket:
+                        del self._buckets[band][band_hash]
+
+    def __len__(self):
+        return len(self._clusters)
@@ -0,0 +1,154 @@
+import os
+import socket
+import threading
+import time
+from collections import namedtuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from . import metrics
+except ImportError:
+    import metrics
+
+# Result of a conditional feed request. `not_modified` is True on a 304, in
+# which case `content` is empty and the caller should reuse its parsed copy.
+FeedResponse = namedtuple('FeedResponse', ['status_code', 'content', 'not_modified'])
+
+
+class FeedTimeout(requests.exceptions.Timeout):
+    """The feed did not finish downloading within its time limit"""
+
+
+def _abort(response):
+    """Shut the response's socket down, waking a read blocked on it"""
+    try:
+        fd = response.raw.fileno()
+    except (OSError, ValueError):
+        return  # already closed
+    # shutdown() acts on the connection, so a duplicate descriptor reaches it too
+    try:
+        with socket.socket(fileno=os.dup(fd)) as sock:
+            sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+class FeedTransport:
+    """Long-lived, pooled HTTP transport shared by every news source.
+
+    Remembers each URL's ETag / Last-Modified validators and sends them back
+    as If-None-Match / If-Modified-Since, so unchanged feeds cost a 304
+    instead of a full download and parse.
+    """
+
+    def __init__(self, pool_size=10, verify=False):
+        self.session = requests.Session()
+        self.session.verify = verify
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._validators = {}  # url -> (etag, last_modified, content length)
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def get(self, url, timeout, conditional=True):
+        """GET a feed, sending validators from the previous 200 when `conditional`.
+
+        `timeout` bounds the whole body download, not just each socket read,
+        so a feed that trickles in a few bytes at a time cannot hold the
+        calling thread past it: the connection is cut and FeedTimeout raised.
+        """
+        limit = time.monotonic() + timeout
+        headers = {}
+        with self._lock:
+            cached = self._validators.get(url) if conditional else None
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        response = self.session.get(url, timeout=timeout, headers=headers, stream=True)
+        try:
+            if response.status_code == 304 and cached:
+                self._record(url, not_modified=True, downloaded=0, saved=cached[2])
+                return FeedResponse(304, b'', True)
+            content = self._read_body(response, url, limit)
+        finally:
+            response.close()
+
+        self._record(url, not_modified=False, downloaded=len(content), saved=0)
+        if response.status_code == 200:
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            with self._lock:
+                if etag or last_modified:
+                    self._validators[url] = (etag, last_modified, len(content))
+                else:
+                    self._validators.pop(url, None)
+        return FeedResponse(response.status_code, content, False)
+
+    @staticmethod
+    def _read_body(response, url, limit):
+        """Body of a streamed response, abandoned once time.monotonic() passes `limit`"""
+        aborted = threading.Event()
+
+        def cut():
+            aborted.set()
+            _abort(response)
+
+        watchdog = threading.Timer(max(0.0, limit - time.monotonic()), cut)
+        watchdog.daemon = True
+        watchdog.start()
+        try:
+            content = response.content
+        except (requests.RequestException, OSError):
+            if not aborted.is_set():
+                raise
+        finally:
+            watchdog.cancel()
+        # A cut connection can also just look like the end of the body
+        if aborted.is_set():
+            raise FeedTimeout(f"{url} still downloading after its time limit")
+        return content
+
+    def forget(self, url):
+        """Drop stored validators so the next request downloads the full feed"""
+        with self._lock:
+            self._validators.pop(url, None)
+
+    def _record(self, url, not_modified, downloaded, saved):
+        with self._lock:
+            stats = self._stats.setdefault(url, {
+                'requests': 0,
+                'not_modified': 0,
+                'bytes_downloaded': 0,
+                'bytes_saved': 0,
+            })
+            stats['requests'] += 1
+            stats['not_modified'] += int(not_modified)
+            stats['bytes_downloaded'] += downloaded
+            stats['bytes_saved'] += saved
+        if saved:
+            metrics.FEED_BYTES_SAVED.inc(saved)
+
+    def stats(self):
+        """Per-URL counters plus the 304 hit rate"""
+        with self._lock:
+            snapshot = {url: dict(counts) for url, counts in self._stats.items()}
+        for counts in snapshot.values():
+            counts['hit_rate'] = counts['not_modified'] / counts['requests'] if counts['requests'] else 0.0
+        return snapshot
+
+    def totals(self):
+        """Counters summed across every URL"""
+        totals = {'requests': 0, 'not_modified': 0, 'bytes_downloaded': 0, 'bytes_saved': 0}
+        for counts in self.stats().values():
+            for key in totals:
+                totals[key] += counts[key]
+        totals['hit_rate'] = totals['not_modified'] / totals['requests'] if totals['requests'] else 0.0
+        return totals
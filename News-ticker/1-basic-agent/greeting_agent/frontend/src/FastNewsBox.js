@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import './NewsBox.css';
+import { subscribeToNews } from './newsStream';
 
 function FastNewsBox() {
     const [news, setNews] = useState([]);
@@ -8,26 +9,24 @@ function FastNewsBox() {
     const [loading, setLoading] = useState(false);
 
     useEffect(() => {
-        fetchNews();
-        const interval = setInterval(fetchNews, 30000); // Every 30 seconds
-        return () => clearInterval(interval);
-    }, []);
-
-    const fetchNews = async () => {
-        try {
-            setLoading(true);
-            const response = await fetch('http://localhost:5000/api/news');
-            const data = await response.json();
-            if (data && Array.isArray(data)) {
-                setNews(data.slice(0, 5)); // Ensure only 5 latest items
-                setLastUpdated(new Date().toLocaleTimeString());
+        // Pushed over Server-Sent Events; polls every 30s if streaming is unavailable
+        setLoading(true);
+        const unsubscribe = subscribeToNews({
+            pollInterval: 30000,
+            onNews: (data) => {
+                if (data && Array.isArray(data)) {
+                    setNews(data.slice(0, 5)); // Ensure only 5 latest items
+                    setLastUpdated(new Date().toLocaleTimeString());
+                }
+                setLoading(false);
+            },
+            onError: (error) => {
+                console.error('Error fetching news:', error);
+                setLoading(false);
             }
-        } catch (error) {
-            console.error('Error fetching news:', error);
-        } finally {
-            setLoading(false);
-        }
-    };
+        });
+        return unsubscribe;
+    }, []);
 
     const handleNewsClick = (article) => {
         if (article.url) {
@@ -41,7 +40,7 @@ function FastNewsBox() {
                 <div className="header-badges">
                     <span className="badge google-adk">GOOGLE ADK</span>
                     <span className="badge live">LIVE</span>
-                    <span className="badge update">30s UPDATE</span>
+                    <span className="badge update">LIVE PUSH</span>
                     <span className="badge gemini">GEMINI</span>
                 </div>
                 
@@ -1,12 +1,12 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect } from 'react';
 import './NewsBox.css';
+import { subscribeToNews } from './newsStream';
 
 function NewsBox() {
     const [news, setNews] = useState([]);
     const [lastUpdated, setLastUpdated] = useState('');
     const [isLoading, setIsLoading] = useState(true);
     const [error, setError] = useState(null);
-    const [isRefreshing, setIsRefreshing] = useState(false);
 
     const getCategoryIcon = (category) => {
         const icons = {
@@ -22,50 +22,28 @@ function NewsBox() {
         return icons[category] || '📱';
     };
 
-    const fetchNews = useCallback(async () => {
-        try {
-            // Only show loading on initial fetch
-            if (!news.length) {
-                setIsLoading(true);
-            }
-            // Show subtle refresh indicator for subsequent fetches
-            setIsRefreshing(true);
-            
-            const response = await fetch('http://localhost:5000/api/news');
-            if (!response.ok) {
-                throw new Error('Failed to fetch news');
-            }
-
-            const data = await response.json();
-            
-            if (Array.isArray(data) && data.length > 0) {
-                setNews(data);
-                setLastUpdated(new Date().toLocaleTimeString());
-                setError(null);
-            }
-        } catch (error) {
-            console.error('Error fetching news:', error);
-            setError('Failed to update news');
-        } finally {
-            setIsLoading(false);
-            setIsRefreshing(false);
-        }
-    }, []); // Remove news.length dependency to prevent unnecessary re-renders
-
     useEffect(() => {
-        // Initial fetch
-        fetchNews();
-
-        // Set up interval for subsequent fetches
-        const interval = setInterval(() => {
-            if (!isRefreshing) {
-                fetchNews();
+        // Pushed over Server-Sent Events; polls every 5s if streaming is unavailable
+        const unsubscribe = subscribeToNews({
+            pollInterval: 5000,
+            onNews: (data) => {
+                if (Array.isArray(data) && data.length > 0) {
+                    setNews(data);
+                    setLastUpdated(new Date().toLocaleTimeString());
+                    setError(null);
+                }
+                setIsLoading(false);
+            },
+            onError: (error) => {
+                console.error('Error fetching news:', error);
+                setError('Failed to update news');
+                setIsLoading(false);
             }
-        }, 5000);
+        });
 
         // Cleanup on unmount
-        return () => clearInterval(interval);
-    }, []); // Empty dependency array since we handle isRefreshing check inside the interval
+        return unsubscribe;
+    }, []);
 
     if (isLoading) {
         return (
@@ -98,7 +76,6 @@ function NewsBox() {
                 <div className="last-updated">
                     <span className="time-icon">⏰</span>
                     Last Refresh: {lastUpdated}
-                    {isRefreshing && <span className="refresh-indicator">⟳</span>}
                     {error && <span className="error-message">{error}</span>}
                 </div>
                 
@@ -0,0 +1,103 @@
+const API_BASE = 'http://localhost:5000';
+
+// Give up on the stream and fall back to polling after this many
+// consecutive errors without reconnecting. The server closes each stream
+// after a few minutes, which the browser reconnects from on its own
+const MAX_STREAM_ERRORS = 3;
+
+const itemKey = (item) => item.url || item.title;
+
+// Rebuild the full list from a delta: unchanged items are reused from the
+// current list and `id` is renumbered by position. `isLatest` marks the newest
+// story, which need not be the first: the server orders by its ranker
+export const applyDelta = (current, delta) => {
+    const byKey = new Map(current.map((item) => [itemKey(item), item]));
+    return delta.keys
+        .map((key) => delta.items[key] || byKey.get(key))
+        .filter(Boolean)
+        .map((item, index) => ({ ...item, id: String(index + 1) }));
+};
+
+// Subscribe to news updates. Uses the /api/news/stream Server-Sent Events
+// endpoint when available and falls back to polling /api/news every
+// `pollInterval` ms. Returns a function that stops the subscription.
+export function subscribeToNews({ onNews, onError, pollInterval = 30000 }) {
+    let items = [];
+    let source = null;
+    let timer = null;
+    let stopped = false;
+
+    const publish = (next) => {
+        items = next;
+        onNews(next);
+    };
+
+    const poll = async () => {
+        try {
+            const response = await fetch(`${API_BASE}/api/news`);
+            if (!response.ok) {
+                throw new Error('Failed to fetch news');
+            }
+            const data = await response.json();
+            if (!stopped && Array.isArray(data)) {
+                publish(data);
+            }
+        } catch (error) {
+            if (!stopped && onError) {
+                onError(error);
+            }
+        }
+    };
+
+    const startPolling = () => {
+        poll();
+        timer = setInterval(poll, pollInterval);
+    };
+
+    if (typeof window === 'undefined' || !window.EventSource) {
+        startPolling();
+    } else {
+        let errors = 0;
+        source = new EventSource(`${API_BASE}/api/news/stream`);
+
+        source.addEventListener('snapshot', (event) => {
+            errors = 0;
+            publish(JSON.parse(event.data).items);
+        });
+
+        source.addEventListener('delta', (event) => {
+            errors = 0;
+            const next = applyDelta(items, JSON.parse(event.data));
+            if (next.length) {
+                publish(next);
+            }
+        });
+
+        source.onopen = () => {
+            errors = 0;
+        };
+
+        source.onerror = () => {
+            errors += 1;
+            // A refused stream (503 when the server is at its stream limit) is
+            // not retried by the browser: poll right away
+            const refused = source.readyState === EventSource.CLOSED;
+            if ((refused || errors >= MAX_STREAM_ERRORS) && !stopped) {
+                console.warn('News stream unavailable, falling back to polling');
+                source.close();
+                source = null;
+                startPolling();
+            }
+        };
+    }
+
+    return () => {
+        stopped = true;
+        if (source) {
+            source.close();
+        }
+        if (timer) {
+            clearInterval(timer);
+        }
+    };
+}
@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import deque
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class SourceHealth:
+    """Rolling health record and circuit breaker for one upstream source.
+
+    The breaker opens after `failure_threshold` consecutive failures and
+    skips the source for `backoff` seconds. After that one trial request is
+    let through (half-open): success closes the breaker, failure re-opens it
+    with the backoff doubled up to `max_backoff`.
+    """
+
+    def __init__(self, name, window=20, failure_threshold=3, base_backoff=60.0, max_backoff=1800.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)  # True for success
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.backoff = base_backoff
+        self.opened_at = None
+        self.last_success = None
+        self.last_failure = None
+        self.last_error = None
+        self.skipped = 0
+
+    def allow(self, now):
+        if self.state == OPEN:
+            if now - self.opened_at >= self.backoff:
+                self.state = HALF_OPEN
+                return True
+            self.skipped += 1
+            return False
+        return True
+
+    def record_success(self, latency, now):
+        self.latencies.append(latency)
+        self.outcomes.append(True)
+        self.last_success = now
+        self.consecutive_failures = 0
+        if self.state != CLOSED:
+            self.state = CLOSED
+            self.backoff = self.base_backoff
+            self.opened_at = None
+
+    def record_failure(self, latency, error, now):
+        self.latencies.append(latency)
+        self.outcomes.append(False)
+        self.last_failure = now
+        self.last_error = error
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN:
+            self.backoff = min(self.max_backoff, self.backoff * 2)
+            self._open(now)
+        elif self.state == CLOSED and self.consecutive_failures >= self.failure_threshold:
+            self._open(now)
+
+    def _open(self, now):
+        self.state = OPEN
+        self.opened_at = now
+
+    @property
+    def error_rate(self):
+        if not self.outcomes:
+            return 0.0
+        return 1.0 - sum(self.outcomes) / len(self.outcomes)
+
+    @property
+    def avg_latency(self):
+        if not self.latencies:
+            return None
+        return sum(self.latencies) / len(self.latencies)
+
+    def score(self):
+        """Higher is healthier: reliable and fast sources come first"""
+        if self.state == OPEN:
+            return 0.0
+        latency = self.avg_latency
+        # Unknown sources rank as average so they get tried early
+        speed = 1.0 / (1.0 + (latency if latency is not None else 1.0))
+        return (1.0 - self.error_rate) * speed
+
+    def to_dict(self, now=None):
+        now = time.time() if now is None else now
+        latency = self.avg_latency
+        return {
+            'name': self.name,
+            'state': self.state,
+            'score': round(self.score(), 4),
+            'error_rate': round(self.error_rate, 4),
+            'avg_latency_ms': round(latency * 1000, 1) if latency is not None else None,
+            'consecutive_failures': self.consecutive_failures,
+            'last_success': self.last_success,
+            'last_failure': self.last_failure,
+            'last_error': self.last_error,
+            'retry_in': max(0.0, self.opened_at + self.backoff - now) if self.state == OPEN else 0.0,
+            'skipped': self.skipped,
+        }
+
+
+class HealthTracker:
+    """Thread-safe collection of SourceHealth records keyed by source name"""
+
+    def __init__(self, **settings):
+        self.settings = settings
+        self._sources = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name):
+        health = self._sources.get(name)
+        if health is None:
+            health = self._sources[name] = SourceHealth(name, **self.settings)
+        return health
+
+    def allow(self, name, now=None):
+        """False while the source's breaker is open"""
+        with self._lock:
+            return self._get(name).allow(time.time() if now is None else now)
+
+    def record_success(self, name, latency, now=None):
+        with self._lock:
+            self._get(name).record_success(latency, time.time() if now is None else now)
+
+    def record_failure(self, name, latency, error, now=None):
+        with self._lock:
+            self._get(name).record_failure(latency, str(error), time.time() if now is None else now)
+
+    def rank(self, items, key=lambda item: item):
+        """Sort items by the health score of `key(item)`, healthiest first"""
+        with self._lock:
+            scores = {key(item): self._get(key(item)).score() for item in items}
+        return sorted(items, key=lambda item: scores[key(item)], reverse=True)
+
+    def get(self, name):
+        with self._lock:
+            health = self._sources.get(name)
+            return health.to_dict() if health is not None else None
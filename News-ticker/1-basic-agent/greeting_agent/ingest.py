@@ -0,0 +1,102 @@
+import heapq
+import itertools
+from collections import OrderedDict
+
+try:
+    from .dedup import StoryClusterer
+except ImportError:
+    from dedup import StoryClusterer
+
+
+class ArticleStore:
+    """Incremental store of every article seen across refreshes.
+
+    `ingest` only does work for articles it has not seen before: they are
+    pushed onto a bounded min-heap ordered by publication time, so the newest
+    `capacity` articles are always available without re-sorting the rest.
+
+    Near-duplicates (the same story from another source under a different
+    headline) are folded into the first article of their cluster, which
+    records every covering source in `sources` instead of taking a slot.
+    `merged` lists the representatives that gained a source in the last
+    `ingest` call.
+
+    History is bounded both by count (`max_seen`) and by the approximate
+    bytes the remembered articles own (`max_bytes`); the oldest go first.
+    """
+
+    def __init__(self, capacity=50, max_seen=5000, clusterer=None, max_bytes=None):
+        self.capacity = capacity
+        self.max_seen = max_seen
+        self.max_bytes = max_bytes
+        self.retained_bytes = 0
+        self.clusterer = clusterer if clusterer is not None else StoryClusterer()
+        self.deduplicated = 0
+        self.merged = []
+
+        self._seen = OrderedDict()  # key -> Article, oldest first
+        self._sizes = {}  # key -> bytes added to retained_bytes when remembered
+        self._titles = {}  # lower-cased title -> key, for exact-title dedup
+        self._heap = []  # (published, seq, key), oldest on top
+        self._counter = itertools.count()
+        self._view = None  # cached newest-first list of keys
+
+    def ingest(self, items):
+        """Merge a batch of fetched Articles; return the ones that were new stories"""
+        new_items = []
+        self.merged = []
+        changed = False
+        for item in items:
+            key = item.key
+            title = item.title.lower().strip()
+            if key in self._seen or title in self._titles:
+                continue
+
+            cluster, is_new_story = self.clusterer.add(key, item)
+            self._remember(key, title, item)
+            if not is_new_story:
+                # Same story from another source: credit it on the representative
+                representative = cluster.representative
+                if len(cluster.sources) != len(representative.sources):
+                    representative.set_sources(cluster.sources)
+                    self.merged.append(representative)
+                self.deduplicated += 1
+                continue
+            new_items.append(item)
+
+            entry = (item.published, next(self._counter), key)
+            if len(self._heap) < self.capacity:
+                heapq.heappush(self._heap, entry)
+                changed = True
+            elif entry > self._heap[0]:
+                heapq.heapreplace(self._heap, entry)
+                changed = True
+
+        if changed:
+            self._view = None
+        return new_items
+
+    def _remember(self, key, title, item):
+        self._seen[key] = item
+        self._titles[title] = key
+        # Subtract exactly what was added on eviction, even if the article grew since
+        self._sizes[key] = size = item.size()
+        self.retained_bytes += size
+        # Forget the oldest articles once the history is over its count or byte budget
+        while self._seen and (
+            len(self._seen) > self.max_seen
+            or (self.max_bytes is not None and self.retained_bytes > self.max_bytes)
+        ):
+            old_key, old_item = self._seen.popitem(last=False)
+            self._titles.pop(old_item.title.lower().strip(), None)
+            self.retained_bytes -= self._sizes.pop(old_key)
+            self.clusterer.remove(old_key)
+
+    def top(self, n):
+        """Newest `n` articles, newest first"""
+        if self._view is None:
+            self._view = [key for _, _, key in sorted(self._heap, reverse=True)]
+        return [self._seen[key] for key in self._view[:n] if key in self._seen]
+
+    def __len__(self):
+        return len(self._seen)
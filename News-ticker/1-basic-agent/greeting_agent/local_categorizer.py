@@ -0,0 +1,162 @@
+import re
+from collections import deque
+
+# Weighted keywords per category. A trailing '*' matches any word starting
+# with the keyword ("robot*" matches robot, robots, robotics); everything else
+# must match whole words.
+CATEGORY_KEYWORDS = {
+    'AI & Machine Learning': {
+        'ai': 2, 'artificial intelligence': 3, 'machine learning': 3, 'deep learning': 3,
+        'neural network*': 3, 'llm*': 3, 'language model*': 3, 'chatgpt': 3, 'gpt*': 2,
+        'openai': 3, 'anthropic': 3, 'claude': 2, 'gemini': 2, 'copilot': 2, 'generative': 2,
+        'chatbot*': 2, 'deepmind': 3, 'agi': 2, 'transformer model*': 2, 'computer vision': 2,
+        'nlp': 2, 'hugging face': 2, 'midjourney': 2, 'ai model*': 3, 'ai agent*': 3,
+    },
+    'Software Development': {
+        'developer*': 2, 'programming': 3, 'programmer*': 3, 'coding': 2, 'code': 1,
+        'github': 3, 'open source': 2, 'open-source': 2, 'python': 2, 'javascript': 3,
+        'typescript': 3, 'rust': 1, 'api': 1, 'apis': 1, 'sdk': 2, 'framework*': 2,
+        'compiler*': 3, 'devops': 3, 'kubernetes': 3, 'linux': 2, 'software update*': 2,
+        'beta': 1, 'ide': 2, 'repository': 2, 'bug fix*': 2, 'database*': 2,
+    },
+    'Hardware & Gadgets': {
+        'iphone*': 2, 'smartphone*': 3, 'phone': 1, 'phones': 1, 'laptop*': 3, 'chip*': 2,
+        'processor*': 3, 'cpu*': 3, 'gpu*': 2, 'nvidia': 1, 'amd': 2, 'intel': 2,
+        'qualcomm': 2, 'apple watch': 3, 'pixel': 2, 'galaxy': 2, 'headphone*': 3,
+        'earbud*': 3, 'tablet*': 3, 'ipad*': 3, 'macbook*': 3, 'camera*': 2, 'tv': 2,
+        'oled': 3, 'display': 1, 'battery life': 2, 'usb-c': 2, 'wearable*': 3,
+        'gadget*': 3, 'smartwatch*': 3, 'review': 1, 'hands-on': 2, 'router*': 2,
+    },
+    'Cybersecurity': {
+        'security': 2, 'hack*': 3, 'breach*': 3, 'ransomware': 3, 'malware': 3,
+        'vulnerabilit*': 3, 'exploit*': 2, 'phishing': 3, 'cyberattack*': 3,
+        'cybersecurity': 3, 'password*': 2, 'zero-day': 3, 'cve': 3, 'encryption': 2,
+        'spyware': 3, 'data leak*': 3, 'botnet*': 3, 'patch': 1, 'attackers': 2,
+    },
+    'Business Tech': {
+        'acquisition*': 3, 'acquire*': 2, 'merger': 3, 'ipo': 3, 'funding': 2,
+        'raises': 2, 'startup*': 2, 'layoff*': 3, 'earnings': 3, 'revenue': 2,
+        'valuation': 3, 'investor*': 2, 'ceo': 1, 'antitrust': 3, 'lawsuit*': 2,
+        'regulator*': 2, 'ftc': 2, 'stock*': 2, 'billion': 1, 'deal': 1, 'series a': 3,
+        'series b': 3, 'venture capital': 3, 'shares': 2, 'profit*': 2, 'market share': 2,
+    },
+    'Gaming': {
+        'game': 2, 'games': 2, 'gaming': 3, 'xbox': 3, 'playstation': 3, 'ps5': 3,
+        'nintendo': 3, 'switch 2': 3, 'steam': 2, 'esports': 3, 'console*': 2,
+        'gamer*': 3, 'fortnite': 3, 'minecraft': 3, 'gta': 3, 'valve': 2, 'twitch': 1,
+        'dlc': 3, 'game pass': 3, 'speedrun*': 3,
+    },
+    'Innovation': {
+        'space': 2, 'spacex': 3, 'nasa': 3, 'rocket*': 3, 'quantum': 3, 'fusion': 3,
+        'electric vehicle*': 3, 'ev': 2, 'evs': 2, 'tesla': 1, 'self-driving': 2,
+        'autonomous': 1, 'breakthrough': 2, 'researchers': 2, 'scientists': 2,
+        'robot*': 2, 'climate': 2, 'solar': 2, 'satellite*': 3, 'biotech': 3,
+        'prototype*': 2, 'drone*': 2, 'lab': 1, 'moon': 2, 'mars': 2,
+    },
+    'Digital Culture': {
+        'social media': 3, 'tiktok': 3, 'instagram': 3, 'facebook': 2, 'youtube': 3,
+        'reddit': 3, 'streaming': 2, 'netflix': 3, 'spotify': 3, 'influencer*': 3,
+        'meme*': 3, 'creator*': 2, 'podcast*': 3, 'threads': 2, 'bluesky': 3,
+        'twitter': 2, 'viral': 3, 'subscriber*': 2, 'fans': 2, 'online': 1,
+    },
+}
+
+# Matches in the title count this much more than matches in the description
+TITLE_WEIGHT = 2
+# Total weighted evidence needed for full confidence
+CONFIDENT_SCORE = 6.0
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9+#\-]+")
+
+
+def prepare_text(text):
+    """Lower-case and pad with spaces so patterns can anchor on word boundaries"""
+    return ' ' + _NON_WORD_RE.sub(' ', (text or '').lower()) + ' '
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over many keywords, scanning text in one pass"""
+
+    def __init__(self, patterns):
+        # patterns: iterable of (pattern string, payload)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for pattern, payload in patterns:
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append(payload)
+
+        # Breadth-first pass to build failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text):
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                yield from out[node]
+
+
+class LocalCategorizer:
+    """Offline, keyword-based categorizer used as a fast tier before Gemini.
+
+    `categorize` returns (category, confidence) where confidence in [0, 1]
+    combines how much evidence was found with how clearly the best category
+    beats the runner-up.
+    """
+
+    def __init__(self, keywords=None):
+        keywords = keywords or CATEGORY_KEYWORDS
+        self.categories = list(keywords)
+        patterns = []
+        for index, category in enumerate(self.categories):
+            for keyword, weight in keywords[category].items():
+                if keyword.endswith('*'):
+                    pattern = ' ' + keyword[:-1]
+                else:
+                    pattern = ' ' + keyword + ' '
+                # Payload carries the keyword so each one counts once per text
+                patterns.append((pattern, (index, weight, keyword)))
+        self._automaton = KeywordAutomaton(patterns)
+
+    def scores(self, title, description=''):
+        totals = [0.0] * len(self.categories)
+        for text, factor in ((title, TITLE_WEIGHT), (description, 1)):
+            seen = set()
+            for index, weight, keyword in self._automaton.iter_matches(prepare_text(text)):
+                if keyword not in seen:
+                    seen.add(keyword)
+                    totals[index] += weight * factor
+        return totals
+
+    def categorize(self, title, description=''):
+        totals = self.scores(title, description)
+        ranked = sorted(range(len(totals)), key=totals.__getitem__, reverse=True)
+        best, runner_up = totals[ranked[0]], totals[ranked[1]]
+        if best <= 0:
+            return None, 0.0
+        margin = (best - runner_up) / best
+        evidence = min(1.0, best / CONFIDENT_SCORE)
+        return self.categories[ranked[0]], round(margin * evidence, 3)
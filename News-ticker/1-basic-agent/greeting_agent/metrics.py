@@ -0,0 +1,217 @@
+import bisect
+import threading
+
+# Default latency buckets in seconds, from sub-millisecond cache hits to slow feeds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        '%s="%s"' % (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(self._samples())
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}' for key, v in items]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be computed at scrape time by `callback`"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+        self.callback = callback
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels))
+
+    def _samples(self):
+        if self.callback is not None:
+            # Callback returns a number, or a {label tuple: number} mapping
+            result = self.callback()
+            if result is None:
+                return []
+            items = sorted(result.items()) if isinstance(result, dict) else [((), result)]
+        else:
+            with self._lock:
+                items = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}' for key, v in items]
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label key -> [bucket counts..., sum, count]
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels):
+        series = self._series.get(self._key(labels))
+        return series[-1] if series else 0
+
+    def total(self):
+        """(sum, count) of observations across every label set"""
+        with self._lock:
+            series = list(self._series.values())
+        return sum(s[-2] for s in series), sum(s[-1] for s in series)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, hits in zip(self.buckets, series):
+                cumulative += hits
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, key, [('le', '+Inf')])
+            lines.append(f'{self.name}_bucket{labels} {series[-1]}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(series[-2])}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}')
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=(), callback=None):
+        return self._register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def expose(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.expose() for metric in metrics) + '\n'
+
+
+# Process-wide registry used by the news pipeline and served at /metrics
+REGISTRY = MetricsRegistry()
+
+FETCH_LATENCY = REGISTRY.histogram(
+    'news_fetch_latency_seconds', 'Time to fetch one upstream source', ['source'])
+PARSE_TIME = REGISTRY.histogram(
+    'news_parse_seconds', 'Time to parse one feed document', ['source'])
+FEEDS_PARSED = REGISTRY.counter(
+    'news_feeds_parsed_total', 'Feed documents parsed, by parser path (fast, fallback, feedparser)', ['parser'])
+CATEGORIZE_LATENCY = REGISTRY.histogram(
+    'news_categorize_seconds', 'Time spent categorizing, by tier', ['tier'])
+CATEGORY_LOOKUPS = REGISTRY.counter(
+    'news_category_lookups_total', 'Articles categorized, by tier that answered', ['tier'])
+CATEGORY_CACHE_LOOKUPS = REGISTRY.counter(
+    'news_category_cache_lookups_total', 'Category cache lookups by result (hit, miss)', ['result'])
+CATEGORY_CACHE_EVICTIONS = REGISTRY.counter(
+    'news_category_cache_evictions_total', 'Category cache entries dropped as expired or least recently used')
+REFRESH_DURATION = REGISTRY.histogram(
+    'news_refresh_seconds', 'Duration of a full news refresh')
+PIPELINE_STAGE_SECONDS = REGISTRY.histogram(
+    'news_pipeline_stage_seconds', 'Time spent in each refresh pipeline stage', ['stage'])
+ARTICLES_INGESTED = REGISTRY.counter(
+    'news_articles_ingested_total', 'New stories added to the article store')
+ARTICLES_DROPPED = REGISTRY.counter(
+    'news_articles_dropped_total', 'Fetched articles discarded, by reason', ['reason'])
+ARTICLES_DEDUPLICATED = REGISTRY.counter(
+    'news_articles_deduplicated_total', 'Articles merged into an existing story as near-duplicates')
+FEED_BYTES_SAVED = REGISTRY.counter(
+    'news_feed_bytes_saved_total', 'Bytes not downloaded thanks to conditional GET')
+FETCH_ERRORS = REGISTRY.counter(
+    'news_fetch_errors_total', 'Failed upstream fetches', ['source'])
+UPSTREAM_REQUESTS = REGISTRY.counter(
+    'news_upstream_requests_total',
+    'Metered upstream requests by outcome (allowed, throttled, reserved, exhausted, rate_limited, coalesced)',
+    ['upstream', 'outcome'])
@@ -0,0 +1,1050 @@
+from datetime import datetime
+import itertools
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dotenv import load_dotenv
+import time
+import urllib3
+from concurrent.futures import ThreadPoolExecutor, wait
+
+try:
+    from .article import Article, epoch_seconds
+    from .article_index import ArticleIndex
+    from .category_cache import CategoryCache
+    from .feed_parser import entry_key, parse_feed
+    from .feed_transport import FeedTransport
+    from .health import HealthTracker
+    from .ingest import ArticleStore
+    from .local_categorizer import LocalCategorizer
+    from .quota import BACKFILL, VISIBLE, Coalescer, QuotaLedger, UpstreamScheduler, is_rate_limited
+    from .ranking import KeywordRanker, get_ranker
+    from .sources import SourceRegistry
+    from . import metrics
+except ImportError:
+    from article import Article, epoch_seconds
+    from article_index import ArticleIndex
+    from category_cache import CategoryCache
+    from feed_parser import entry_key, parse_feed
+    from feed_transport import FeedTransport
+    from health import HealthTracker
+    from ingest import ArticleStore
+    from local_categorizer import LocalCategorizer
+    from quota import BACKFILL, VISIBLE, Coalescer, QuotaLedger, UpstreamScheduler, is_rate_limited
+    from ranking import KeywordRanker, get_ranker
+    from sources import SourceRegistry
+    import metrics
+
+logger = logging.getLogger(__name__)
+
+# Disable SSL warnings for development (the feed transport skips verification)
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+# Load environment variables from .env file
+load_dotenv()
+
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def module_path(path):
+    """Resolve a configured file path, relative ones against this directory rather than the working directory"""
+    return os.path.join(MODULE_DIR, os.path.expanduser(path)) if path else path
+
+
+# Get API keys. Both are optional: without NEWS_API_KEY only RSS is fetched,
+# without GOOGLE_API_KEY articles are categorized by the local engine alone.
+# The Gemini and NewsAPI clients are only imported and built on first use.
+google_api_key = os.getenv('GOOGLE_API_KEY')
+news_api_key = os.getenv('NEWS_API_KEY')
+
+# RSS fetch tuning: parallel workers, per-feed timeout and overall refresh deadline (seconds)
+RSS_FETCH_WORKERS = int(os.getenv('RSS_FETCH_WORKERS', '8'))
+RSS_FEED_TIMEOUT = float(os.getenv('RSS_FEED_TIMEOUT', '10'))
+RSS_REFRESH_DEADLINE = float(os.getenv('RSS_REFRESH_DEADLINE', '15'))
+
+# Feed parsing: "fast" streams only the newest FEED_MAX_ENTRIES entries out of
+# the XML and falls back to feedparser for anything it cannot read;
+# "feedparser" always does a full feedparser parse
+FEED_PARSER = os.getenv('FEED_PARSER', 'fast').lower()
+FEED_MAX_ENTRIES = int(os.getenv('FEED_MAX_ENTRIES', '10'))
+
+# Health-tracker name for the NewsAPI upstream
+NEWSAPI_SOURCE = 'NewsAPI'
+# Articles requested per NewsAPI call (one call per refresh whatever the size)
+NEWSAPI_PAGE_SIZE = int(os.getenv('NEWSAPI_PAGE_SIZE', '20'))
+# NewsAPI requests allowed per UTC day (0 = unlimited; the free plan allows 100)
+# and per minute. By default the daily budget is spread evenly over the day
+# rather than spent by the first refreshes of the morning.
+NEWSAPI_DAILY_BUDGET = int(os.getenv('NEWSAPI_DAILY_BUDGET', '100')) or None
+NEWSAPI_PER_MINUTE = float(os.getenv('NEWSAPI_PER_MINUTE', '0')) or (NEWSAPI_DAILY_BUDGET or 1440) / 1440
+
+# Gemini requests allowed per minute and per UTC day (0 = unlimited). The last
+# GEMINI_BACKFILL_RESERVE share of the day is kept for articles the ticker
+# shows, which may wait up to GEMINI_VISIBLE_MAX_WAIT seconds for a token;
+# a 429 from Gemini pauses every request for GEMINI_RATE_LIMIT_BACKOFF seconds
+GEMINI_SOURCE = 'Gemini'
+GEMINI_PER_MINUTE = float(os.getenv('GEMINI_PER_MINUTE', '15'))
+GEMINI_DAILY_BUDGET = int(os.getenv('GEMINI_DAILY_BUDGET', '1500')) or None
+GEMINI_BACKFILL_RESERVE = float(os.getenv('GEMINI_BACKFILL_RESERVE', '0.2'))
+GEMINI_VISIBLE_MAX_WAIT = float(os.getenv('GEMINI_VISIBLE_MAX_WAIT', '2'))
+GEMINI_RATE_LIMIT_BACKOFF = float(os.getenv('GEMINI_RATE_LIMIT_BACKOFF', '60'))
+
+# Most articles categorized by one Gemini batch request
+GEMINI_BATCH_SIZE = max(1, int(os.getenv('GEMINI_BATCH_SIZE', '25')))
+
+# SQLite file holding each upstream's daily spend and rate-limit state, so
+# budgets survive restarts and are shared by every process on the host
+# (empty = in memory only, reset on restart)
+NEWS_QUOTA_PATH = module_path(os.getenv('NEWS_QUOTA_PATH', 'quota.db'))
+
+# Articles whose Gemini categorization was deferred (no quota, or no usable
+# answer): how many are
+# remembered, and how many are retried per refresh
+DEFERRED_CATEGORIZATION_MAX = 1000
+DEFERRED_RETRY_BATCH = 50
+
+# Items in the ticker queue served by /api/news without query parameters
+NEWS_TICKER_SIZE = int(os.getenv('NEWS_TICKER_SIZE', '5'))
+# Articles kept in the queryable index behind /api/news?category=&source=...
+NEWS_INDEX_CAPACITY = int(os.getenv('NEWS_INDEX_CAPACITY', '1000'))
+NEWS_INDEX_MAX_MB = float(os.getenv('NEWS_INDEX_MAX_MB', '8'))
+
+# Article history kept for dedup and incremental ingest: the oldest articles are
+# forgotten beyond this many, or beyond this much memory (megabytes)
+NEWS_RETENTION_MAX_ARTICLES = int(os.getenv('NEWS_RETENTION_MAX_ARTICLES', '5000'))
+NEWS_RETENTION_MAX_MB = float(os.getenv('NEWS_RETENTION_MAX_MB', '16'))
+
+# Ticker ranking: "recency" is newest first; "keywords" weighs AI-relevance
+# keywords and halves an article's weight every NEWS_RANK_HALF_LIFE_HOURS
+NEWS_RANKER = os.getenv('NEWS_RANKER', 'recency').lower()
+NEWS_RANK_HALF_LIFE_HOURS = float(os.getenv('NEWS_RANK_HALF_LIFE_HOURS', '6'))
+# The agent reuses the last ranking while it is younger than this (seconds)
+RANKING_MAX_AGE = float(os.getenv('NEWS_REFRESH_INTERVAL', '60'))
+
+# JSON catalog of news sources with per-source weight, polling and quota settings
+NEWS_SOURCES_PATH = module_path(os.getenv('NEWS_SOURCES_PATH', 'sources.json'))
+
+# Persistent category cache: SQLite file, entry lifetime (seconds) and size cap
+CATEGORY_CACHE_PATH = module_path(os.getenv('CATEGORY_CACHE_PATH', 'category_cache.db'))
+CATEGORY_CACHE_TTL = float(os.getenv('CATEGORY_CACHE_TTL', str(7 * 24 * 3600)))
+CATEGORY_CACHE_MAX_ENTRIES = int(os.getenv('CATEGORY_CACHE_MAX_ENTRIES', '10000'))
+
+# The fixed set of categories Gemini may assign
+CATEGORIES = [
+    'AI & Machine Learning',
+    'Software Development',
+    'Hardware & Gadgets',
+    'Cybersecurity',
+    'Business Tech',
+    'Gaming',
+    'Innovation',
+    'Digital Culture',
+]
+DEFAULT_CATEGORY = 'Technology'
+
+# Categorizer tiers: "hybrid" tries the local keyword engine and only asks Gemini
+# when its confidence is below LOCAL_CATEGORY_MIN_CONFIDENCE, "local" never calls
+# Gemini, "gemini" skips the local engine entirely
+CATEGORIZER_MODE = os.getenv('CATEGORIZER_MODE', 'hybrid').lower()
+LOCAL_CATEGORY_MIN_CONFIDENCE = float(os.getenv('LOCAL_CATEGORY_MIN_CONFIDENCE', '0.5'))
+_CATEGORY_LOOKUP = {c.lower(): c for c in CATEGORIES}
+
+
+def match_category(text):
+    """Map model output onto one of CATEGORIES, or None if it is not one"""
+    if not isinstance(text, str):
+        return None
+    return _CATEGORY_LOOKUP.get(text.strip().strip('"\'.-* ').lower())
+
+
+def match_batch_categories(text, count):
+    """Parse a batch answer into {article number: category}.
+
+    Only objects carrying the 1-based `id` of an article from the prompt
+    are used, so an answer that drops, adds or reorders items cannot shift
+    categories onto the wrong articles. Numbers answered twice are ignored.
+    """
+    results = json.loads(text)
+    if isinstance(results, dict):
+        results = results.get('categories', [])
+    if not isinstance(results, list):
+        return {}
+    matched, repeated = {}, set()
+    for result in results:
+        if not isinstance(result, dict):
+            continue
+        number = result.get('id')
+        if isinstance(number, str) and number.strip().isdigit():
+            number = int(number)
+        category = match_category(result.get('category'))
+        if not isinstance(number, int) or not 1 <= number <= count or category is None:
+            continue
+        if number in matched:
+            repeated.add(number)
+        matched[number] = category
+    for number in repeated:
+        del matched[number]
+    return matched
+
+
+def newest(articles):
+    """The most recently published of `articles`, or None"""
+    return max(articles, key=lambda article: article.published, default=None)
+
+
+class NewsTool:
+    """The news pipeline shared by the Flask API and the ADK agent's tool.
+
+    One refresh runs fetch -> normalize -> dedupe -> score -> rank ->
+    categorize -> publish, timing every stage. Ranking comes before
+    categorization so the articles the ticker shows are categorized first
+    when Gemini quota is short. Both entry points read the result:
+    `execute` returns the published ticker JSON, `__call__` the same
+    ranking formatted for the agent. Concurrent refreshes share one run.
+
+    Importing this module is cheap: it pulls in neither the ADK nor the
+    Gemini SDK, and the Gemini model and NewsAPI client are created on
+    first use, so the API can start (and serve cached data) without either
+    API key.
+    """
+
+    def __init__(self):
+        # Ticker queue (exactly max_news_items items, in ranking order)
+        self.news_queue = [] 
+        self.max_news_items = NEWS_TICKER_SIZE
+        
+        # Output of the last pipeline run, shared by both entry points
+        self.ranker = get_ranker(NEWS_RANKER, half_life_hours=NEWS_RANK_HALF_LIFE_HOURS)
+        # AI relevance of each story, whatever the ranker; the agent only returns relevant ones
+        self.relevance = KeywordRanker(half_life_hours=NEWS_RANK_HALF_LIFE_HOURS)
+        self.ranking = []
+        self.ranked_at = None
+        self.last_stage_timings = {}
+        self._pipeline_lock = threading.Lock()
+        
+        # Metered upstreams: rate limits and daily budgets, and concurrent
+        # callers sharing one in-flight call instead of each spending quota
+        self.quota_ledger = QuotaLedger(NEWS_QUOTA_PATH) if NEWS_QUOTA_PATH else None
+        self.newsapi_scheduler = UpstreamScheduler(
+            NEWSAPI_SOURCE, NEWSAPI_PER_MINUTE, NEWSAPI_DAILY_BUDGET, ledger=self.quota_ledger
+        )
+        self.gemini_scheduler = UpstreamScheduler(
+            GEMINI_SOURCE, GEMINI_PER_MINUTE, GEMINI_DAILY_BUDGET, reserve=GEMINI_BACKFILL_RESERVE,
+            ledger=self.quota_ledger
+        )
+        self._refresh_coalescer = Coalescer('refresh')
+        self._newsapi_coalescer = Coalescer(NEWSAPI_SOURCE)
+        self._gemini_coalescer = Coalescer(GEMINI_SOURCE)
+        # key -> Article on a provisional category, waiting for Gemini quota
+        self._deferred = OrderedDict()
+        self._recategorized = []  # deferred articles resolved since the last publish
+        
+        # Every article seen so far; refreshes only process what is new
+        self.article_store = ArticleStore(
+            max_seen=NEWS_RETENTION_MAX_ARTICLES,
+            max_bytes=int(NEWS_RETENTION_MAX_MB * 1024 * 1024)
+        )
+        self._queue_keys = None  # identity of the articles currently in news_queue
+        self._queue_json = None
+        # True while news_queue holds made-up headlines because there were no articles
+        self.serving_fallback = False
+        self._fallback_headlines = None
+        
+        # Every categorized story, queryable by category, source and time
+        self.article_index = ArticleIndex(
+            capacity=NEWS_INDEX_CAPACITY,
+            max_bytes=int(NEWS_INDEX_MAX_MB * 1024 * 1024)
+        )
+        
+        # One pooled transport (SSL verification disabled) shared by every source
+        self.transport = FeedTransport(pool_size=max(1, RSS_FETCH_WORKERS))
+        self._feed_entries = {}  # feed url -> entries parsed from the last 200 response
+        
+        # Categories survive restarts so the same headline is never classified twice
+        self.category_cache = CategoryCache(
+            CATEGORY_CACHE_PATH,
+            ttl=CATEGORY_CACHE_TTL,
+            max_entries=CATEGORY_CACHE_MAX_ENTRIES
+        )
+        self._gemini_model = None
+        self._client_lock = threading.Lock()
+        self.categorizer_mode = CATEGORIZER_MODE
+        if not google_api_key and self.categorizer_mode != 'local':
+            logger.warning("GOOGLE_API_KEY not set, categorizing with the local engine only")
+            self.categorizer_mode = 'local'
+        self.local_min_confidence = LOCAL_CATEGORY_MIN_CONFIDENCE
+        self.local_categorizer = LocalCategorizer()
+        
+        # NewsAPI client, built with the shared session on first use
+        self._newsapi_client = None
+        self._newsapi_initialized = not news_api_key
+        
+        # RSS feeds for tech news and innovations, polled adaptively per source
+        self.source_registry = SourceRegistry.from_file(NEWS_SOURCES_PATH)
+        
+        # Rolling latency/error health and a circuit breaker per source (and NewsAPI)
+        self.health = HealthTracker()
+        self.rss_workers = max(1, RSS_FETCH_WORKERS)
+        self.rss_feed_timeout = RSS_FEED_TIMEOUT
+        self.rss_refresh_deadline = RSS_REFRESH_DEADLINE
+        self.fast_feed_parser = FEED_PARSER != 'feedparser'
+        self.feed_max_entries = FEED_MAX_ENTRIES
+        
+        # Scrape-time gauges for state owned by this tool
+        metrics.REGISTRY.gauge(
+            'news_feed_not_modified_ratio', 'Share of feed requests answered with 304'
+        ).callback = lambda: self.transport.totals()['hit_rate']
+        metrics.REGISTRY.gauge(
+            'news_category_cache_entries', 'Entries in the persistent category cache'
+        ).callback = lambda: len(self.category_cache)
+        metrics.REGISTRY.gauge(
+            'news_article_store_size', 'Articles remembered by the incremental store'
+        ).callback = lambda: len(self.article_store)
+        schedulers = (self.newsapi_scheduler, self.gemini_scheduler)
+        metrics.REGISTRY.gauge(
+            'news_upstream_budget_used', "Requests spent from today's budget", ['upstream']
+        ).callback = lambda: {(s.name,): s.to_dict()['used_today'] for s in schedulers}
+        metrics.REGISTRY.gauge(
+            'news_upstream_budget_remaining', "Requests left in today's budget", ['upstream']
+        ).callback = lambda: {
+            (s.name,): s.to_dict()['remaining_today'] for s in schedulers if s.budget.limit is not None
+        }
+        metrics.REGISTRY.gauge(
+            'news_upstream_tokens', 'Requests the rate limiter would allow right now', ['upstream']
+        ).callback = lambda: {(s.name,): s.to_dict()['tokens'] for s in schedulers}
+        metrics.REGISTRY.gauge(
+            'news_categorization_deferred', 'Articles waiting for Gemini quota on a provisional category'
+        ).callback = lambda: len(self._deferred)
+
+    @property
+    def newsapi_client(self):
+        """The NewsAPI client, or None without NEWS_API_KEY or if it cannot be built"""
+        if not self._newsapi_initialized:
+            with self._client_lock:
+                if not self._newsapi_initialized:
+                    try:
+                        from newsapi import NewsApiClient
+                        self._newsapi_client = NewsApiClient(
+                            api_key=news_api_key,
+                            session=self.transport.session
+                        )
+                        logger.info("NewsAPI client initialized with shared session")
+                    except Exception as e:
+                        logger.error("NewsAPI initialization failed: %s", e)
+                    self._newsapi_initialized = True
+        return self._newsapi_client
+
+    @newsapi_client.setter
+    def newsapi_client(self, client):
+        self._newsapi_client = client
+        self._newsapi_initialized = True
+
+    def fetch_from_newsapi(self):
+        """Fetch technology news from NewsAPI, as the API's raw article dicts"""
+        # Concurrent callers share one request
+        return self._newsapi_coalescer.do(NEWSAPI_SOURCE, self._fetch_newsapi)
+
+    def _fetch_newsapi(self):
+        if not self.newsapi_client:
+            logger.debug("NewsAPI client not available, skipping")
+            return []
+        if not self.health.allow(NEWSAPI_SOURCE):
+            logger.info("NewsAPI circuit open, skipping")
+            return []
+        if not self.newsapi_scheduler.acquire(VISIBLE):
+            logger.info("NewsAPI quota: skipping this refresh", extra={'quota': self.newsapi_scheduler.to_dict()})
+            return []
+        
+        started = time.monotonic()
+        try:
+            logger.debug("Fetching from NewsAPI")
+            
+            # Simple query for all tech news with optimized parameters
+            tech_articles = self.newsapi_client.get_everything(
+                q='technology OR innovation OR software OR hardware OR gadget OR app OR startup',
+                language='en',
+                sort_by='publishedAt',
+                page_size=NEWSAPI_PAGE_SIZE
+            )
+            latency = time.monotonic() - started
+            self.health.record_success(NEWSAPI_SOURCE, latency)
+            metrics.FETCH_LATENCY.observe(latency, source=NEWSAPI_SOURCE)
+            
+            # Raw NewsAPI article dicts; `normalize` turns them into Articles
+            news_items = tech_articles.get('articles') or []
+            logger.info("Fetched articles from NewsAPI", extra={'articles': len(news_items)})
+            return news_items
+            
+        except Exception as e:
+            if is_rate_limited(e):
+                # NewsAPI limits are daily: stop asking until the budget resets
+                logger.warning("NewsAPI rate limit reached, pausing until the daily reset: %s", e)
+                self.newsapi_scheduler.exhaust()
+                return []
+            logger.warning("NewsAPI fetch error: %s", e)
+            self.health.record_failure(NEWSAPI_SOURCE, time.monotonic() - started, e)
+            metrics.FETCH_ERRORS.inc(source=NEWSAPI_SOURCE)
+            return []
+
+    def fetch_from_rss(self):
+        """Fetch technology news from RSS feeds concurrently.
+
+        Returns (title, link, description, pub_date, guid, source name)
+        tuples, at most each source's quota, newest first.
+        """
+        logger.debug("Fetching from RSS feeds")
+        news_items = []
+        used_titles = set()  # Track unique titles across all feeds
+        
+        # Only sources whose poll interval has elapsed go to the network;
+        # the rest contribute the entries parsed on their last poll
+        due = self.source_registry.due()
+        
+        # Skip sources whose circuit is open; fetch the fastest reliable ones first
+        blocked = [source.name for source in due if not self.health.allow(source.name)]
+        if blocked:
+            logger.info("Circuit open, skipping sources", extra={'sources': blocked})
+        due = self.health.rank([source for source in due if source.name not in blocked],
+                               key=lambda source: source.name)
+        logger.info("Polling sources", extra={'due': len(due), 'enabled': len(self.source_registry.enabled())})
+        
+        # Fetch and parse due feeds in parallel; stop waiting at the refresh deadline
+        deadline = time.monotonic() + self.rss_refresh_deadline
+        executor = ThreadPoolExecutor(max_workers=self.rss_workers, thread_name_prefix='rss-fetch')
+        futures = {
+            source.url: executor.submit(self._fetch_feed_entries, source, deadline)
+            for source in due
+        }
+        done, pending = wait(futures.values(), timeout=self.rss_refresh_deadline)
+        # Stragglers are not waited for: the transport cuts them off at their
+        # timeout and _fetch_feed_entries discards whatever finishes late
+        executor.shutdown(wait=False, cancel_futures=True)
+        if pending:
+            late = ", ".join(sorted(source.name for source in due if futures[source.url] in pending))
+            logger.warning("RSS refresh deadline reached, using last entries for: %s", late)
+        
+        # Merge by source weight, then catalog order, so results stay deterministic
+        sources = sorted(self.source_registry.enabled(), key=lambda source: source.weight, reverse=True)
+        for source in sources:
+            future = futures.get(source.url)
+            if future is not None and future in done:
+                entries = future.result()
+            else:
+                # Not due, or still fetching at the deadline: keep what it served last time
+                entries = self._feed_entries.get(source.url, [])
+            feed_name = source.name
+            
+            # Only take up to `quota` unique articles from each feed
+            feed_count = 0
+            for entry in entries:
+                if feed_count >= source.quota:
+                    break
+                title = entry[0]
+                # Skip if we already have this title
+                if title in used_titles:
+                    metrics.ARTICLES_DROPPED.inc(reason='duplicate_title')
+                    continue
+                news_items.append(entry + (feed_name,))
+                used_titles.add(title)
+                logger.debug("Added from %s: %s", feed_name, title[:50])
+                feed_count += 1
+        
+        # Newest first; every item goes to the index, not just the ticker
+        news_items.sort(key=lambda entry: entry[3], reverse=True)
+        final_items = news_items
+        totals = self.transport.totals()
+        logger.info("Fetched items from RSS feeds", extra={
+            'items': len(final_items),
+            'not_modified': totals['not_modified'],
+            'requests': totals['requests'],
+            'bytes_saved': totals['bytes_saved'],
+        })
+        return final_items
+
+    def _fetch_feed_entries(self, source, deadline):
+        """Download and parse one feed, returning (title, link, description, pub_date, guid) tuples"""
+        feed_url, feed_name = source.url, source.name
+        started = time.monotonic()
+        try:
+            logger.debug("Checking %s", feed_name)
+            
+            # Never wait past the per-feed timeout or the overall refresh deadline
+            timeout = min(self.rss_feed_timeout, deadline - time.monotonic())
+            if timeout <= 0:
+                return []
+            
+            # Only send validators when we still hold the entries they refer to
+            previous = self._feed_entries.get(feed_url)
+            response = self.transport.get(feed_url, timeout=timeout, conditional=previous is not None)
+            latency = time.monotonic() - started
+            metrics.FETCH_LATENCY.observe(latency, source=feed_name)
+            if time.monotonic() > deadline:
+                return self._drop_late(source)
+            if response.not_modified:
+                logger.debug("%s not modified, reusing parsed entries", feed_name)
+                self.health.record_success(feed_name, latency)
+                self.source_registry.record_poll(source, changed=False)
+                return previous
+            if response.status_code != 200:
+                logger.warning("Failed to fetch %s: HTTP %s", feed_name, response.status_code)
+                self.health.record_failure(feed_name, latency, f"HTTP {response.status_code}")
+                metrics.FETCH_ERRORS.inc(source=feed_name)
+                return []
+            self.health.record_success(feed_name, latency)
+            
+            parse_started = time.perf_counter()
+            # Undated entries keep the date they were first seen with, so they do not look new every poll
+            first_seen = {entry_key(entry): entry[3] for entry in previous} if previous else None
+            entries, parser = parse_feed(
+                response.content, limit=self.feed_max_entries, fast=self.fast_feed_parser,
+                first_seen=first_seen
+            )
+            metrics.PARSE_TIME.observe(time.perf_counter() - parse_started, source=feed_name)
+            metrics.FEEDS_PARSED.inc(parser=parser)
+            if parser == 'fallback':
+                logger.debug("%s rejected by the fast parser, used feedparser", feed_name)
+            
+            if not entries:
+                logger.info("No entries found in %s", feed_name)
+                self.source_registry.record_poll(source, changed=False)
+                return []
+            
+            if time.monotonic() > deadline:
+                return self._drop_late(source)
+            
+            # A feed counts as updated when its newest entry differs from last poll
+            changed = not previous or previous[0] != entries[0]
+            self.source_registry.record_poll(source, changed=changed)
+            self._feed_entries[feed_url] = entries
+            return entries
+            
+        except Exception as e:
+            logger.warning("Error fetching %s: %s", feed_name, e)
+            self.health.record_failure(feed_name, time.monotonic() - started, e)
+            metrics.FETCH_ERRORS.inc(source=feed_name)
+            return []
+
+    def _drop_late(self, source):
+        """Discard a feed that finished after the refresh deadline.
+
+        The refresh has already merged this feed's previous entries, so the
+        new ones are not stored; its validators are dropped too, since they
+        would describe a download nobody kept.
+        """
+        logger.debug("%s finished after the refresh deadline, discarding", source.name)
+        self.transport.forget(source.url)
+        return []
+
+    def source_status(self):
+        """Health, polling and transfer stats for every source, healthiest first"""
+        transfer = self.transport.stats()
+        status = []
+        for source in self.source_registry:
+            entry = source.to_dict()
+            entry['health'] = self.health.get(source.name)
+            entry['transfer'] = transfer.get(source.url)
+            status.append(entry)
+        if self.newsapi_client:
+            status.append({
+                'name': NEWSAPI_SOURCE,
+                'enabled': True,
+                'health': self.health.get(NEWSAPI_SOURCE),
+                'quota': self.newsapi_scheduler.to_dict(),
+            })
+        status.sort(key=lambda entry: entry['health']['score'] if entry['health'] else 0.5, reverse=True)
+        return status
+
+    def index_article(self, item):
+        """Add or update an article in the queryable index, as its pre-serialized JSON"""
+        self.article_index.add(
+            item.key, item.published, item.category or DEFAULT_CATEGORY, item.sources, item.to_json()
+        )
+
+    def format_news_item(self, article, position, is_latest=None):
+        """Format an Article for the queue with a more detailed timestamp"""
+        hours_old = max(0, time.time() - article.published) / 3600
+        
+        if hours_old < 1:
+            time_ago = f"{int(hours_old * 60)} minutes ago"
+        else:
+            time_ago = f"{int(hours_old)} hours ago"
+            
+        return {
+            "id": str(position),
+            "title": article.title,
+            "timestamp": f"Released: {article.timestamp} ({time_ago})",
+            "isLatest": position == 1 if is_latest is None else is_latest,
+            "source": article.source,
+            "url": article.url,
+            "category": article.category or DEFAULT_CATEGORY
+        }
+
+    def get_fallback_headlines(self):
+        """Enhanced fallback headlines when real news APIs fail - Based on current AI trends"""
+        # Built once, so repeated fallbacks serialize identically and do not bump the snapshot version
+        if self._fallback_headlines is None:
+            self._fallback_headlines = self._build_fallback_headlines()
+        return [dict(item) for item in self._fallback_headlines]
+
+    def _build_fallback_headlines(self):
+        now = time.time()
+        # Create realistic current headlines based on actual recent AI news trends
+        fallback_data = [
+            Article(
+                'OpenAI launches new GPT-4 Turbo with vision capabilities and reduced pricing',
+                source='AI News',
+                url='https://openai.com/blog',
+                published=now - 2 * 3600,
+            ),
+            Article(
+                'Google DeepMind announces breakthrough in protein folding with AlphaFold 3',
+                source='Tech Daily',
+                url='https://deepmind.google/research/',
+                published=now - 4 * 3600,
+            ),
+            Article(
+                'Microsoft integrates advanced AI copilot features across Office 365 suite',
+                source='Enterprise Tech',
+                url='https://blogs.microsoft.com/ai/',
+                published=now - 6 * 3600,
+            ),
+            Article(
+                'Meta releases Llama 3 with improved multilingual support and reasoning',
+                source='ML Research',
+                url='https://ai.meta.com/blog/',
+                published=now - 8 * 3600,
+            ),
+            Article(
+                'Anthropic Claude 3 achieves new benchmarks in safety and helpfulness metrics',
+                source='AI Safety News',
+                url='https://www.anthropic.com/news',
+                published=now - 10 * 3600,
+            )
+        ]
+        
+        return [self.format_news_item(item, i+1) for i, item in enumerate(fallback_data)]
+
+    @contextmanager
+    def _stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.last_stage_timings[name] = elapsed
+            metrics.PIPELINE_STAGE_SECONDS.observe(elapsed, stage=name)
+
+    def run_pipeline(self):
+        """One refresh through every stage; returns the ticker queue as JSON"""
+        with self._pipeline_lock:
+            self.last_stage_timings = {}
+            with self._stage('fetch'):
+                # Both upstreams feed the index; RSS sources are only polled when due
+                newsapi_items = self.fetch_from_newsapi()
+                rss_items = self.fetch_from_rss()
+            with self._stage('normalize'):
+                articles = self.normalize(newsapi_items, rss_items)
+            with self._stage('dedupe'):
+                new_items = self.dedupe(articles)
+            with self._stage('score'):
+                for item in new_items:
+                    item.score = self.relevance.score(item)
+            with self._stage('rank'):
+                self.ranking = self.ranker.rank(self.article_store.top(self.article_store.capacity))
+                self.ranked_at = time.time()
+            with self._stage('categorize'):
+                self.categorize_by_priority(new_items)
+            with self._stage('publish'):
+                payload = self.publish(new_items)
+            logger.info("Pipeline finished", extra={
+                'stages': {stage: round(seconds, 4) for stage, seconds in self.last_stage_timings.items()},
+            })
+            return payload
+
+    def normalize(self, newsapi_items, rss_items):
+        """Turn raw NewsAPI dicts and RSS entries into Articles, dropping unusable ones"""
+        articles = []
+        for article in newsapi_items:
+            if not article.get('title') or article['title'].lower() == '[removed]':
+                metrics.ARTICLES_DROPPED.inc(reason='removed')
+                continue
+            try:
+                pub_date = datetime.fromisoformat(article['publishedAt'].replace('Z', '+00:00'))
+                articles.append(Article(
+                    article['title'],
+                    url=article['url'],
+                    description=article.get('description'),
+                    source=(article.get('source') or {}).get('name'),
+                    published=epoch_seconds(pub_date),
+                ))
+            except Exception as e:
+                logger.warning("Error processing NewsAPI article: %s", e)
+                metrics.ARTICLES_DROPPED.inc(reason='parse_error')
+        for title, link, description, pub_date, guid, source_name in rss_items:
+            articles.append(Article(
+                title,
+                url=link,
+                description=description,
+                source=source_name,
+                published=epoch_seconds(pub_date),
+                guid=guid,
+            ))
+        
+        # Article collapses whitespace in headlines; drop the ones left empty and
+        # never let a feed with a bad clock outrank real news
+        now = int(time.time())
+        normalized = []
+        for article in articles:
+            if not article.title:
+                metrics.ARTICLES_DROPPED.inc(reason='empty_title')
+                continue
+            article.published = min(article.published, now)
+            normalized.append(article)
+        return normalized
+
+    def dedupe(self, articles):
+        """Merge into the store; return the articles that are new stories"""
+        deduplicated_before = self.article_store.deduplicated
+        new_items = self.article_store.ingest(articles)
+        deduplicated = self.article_store.deduplicated - deduplicated_before
+        metrics.ARTICLES_INGESTED.inc(len(new_items))
+        metrics.ARTICLES_DEDUPLICATED.inc(deduplicated)
+        metrics.ARTICLES_DROPPED.inc(len(articles) - len(new_items) - deduplicated, reason='already_seen')
+        logger.info("Ingested articles", extra={
+            'fetched': len(articles),
+            'new': len(new_items),
+            'near_duplicates': deduplicated,
+        })
+        return new_items
+
+    def categorize_by_priority(self, new_items):
+        """Categorize what the ticker shows first, then new backfill, then deferred articles"""
+        backlog = list(itertools.islice(self._deferred.values(), DEFERRED_RETRY_BATCH))
+        self.categorize_items(self.ranking[:self.max_news_items], priority=VISIBLE, retry_deferred=True)
+        self.categorize_items(new_items, priority=BACKFILL)
+        self.categorize_items(backlog, priority=BACKFILL, retry_deferred=True)
+
+    def publish(self, new_items):
+        """Index new and newly merged stories and serialize the ticker from the ranking"""
+        # Stories that gained a source or a real category are re-indexed
+        recategorized, self._recategorized = self._recategorized, []
+        for item in new_items + self.article_store.merged + recategorized:
+            self.index_article(item)
+        
+        if not self.ranking:
+            logger.warning("No news available, using fallback headlines")
+            self.news_queue = self.get_fallback_headlines()
+            self.serving_fallback = True
+            self._queue_keys = self._queue_json = None
+            return json.dumps(self.news_queue)
+        self.serving_fallback = False
+        
+        selected = self.ranking[:self.max_news_items]
+        # The ranker orders the ticker; the "latest" badge goes to the newest story in it
+        latest = newest(selected)
+        # Identity, source coverage and category of each article decide whether to republish
+        keys = [(item.key, len(item.sources), item.category) for item in selected]
+        if keys == self._queue_keys and self._queue_json is not None:
+            logger.debug("News queue unchanged")
+            return self._queue_json
+        
+        self.news_queue = []
+        for news_item in selected:
+            position = len(self.news_queue) + 1  # This ensures sequential numbering
+            formatted_item = {
+                "id": str(position),  # Sequential number from 1 to max_news_items
+                **news_item.payload(),
+                "isLatest": news_item is latest
+            }
+            self.news_queue.append(formatted_item)
+            logger.debug("Added #%d: %s", position, news_item.title[:50])
+        
+        # Fill remaining ticker slots with fallback items
+        while len(self.news_queue) < self.max_news_items:
+            position = len(self.news_queue) + 1
+            fallback_item = {
+                "id": str(position),
+                "title": f"Technology Update {position}",
+                "timestamp": f"Released: {datetime.now().strftime('%I:%M %p - %b %d')}",
+                "isLatest": position == 1,
+                "source": "Tech News",
+                "url": "",
+                "category": "Technology"
+            }
+            self.news_queue.append(fallback_item)
+            logger.debug("Added fallback #%d", position)
+        
+        logger.info("Built news queue", extra={'items': len(self.news_queue), 'ranker': self.ranker.name})
+        self._queue_keys = keys
+        self._queue_json = json.dumps(self.news_queue)
+        return self._queue_json
+
+    def execute(self, inputs=None):
+        """API entry point: run the pipeline and return the ticker queue as JSON"""
+        try:
+            # A refresh already in flight (e.g. the agent's and the refresher's) is shared
+            return self._refresh_coalescer.do('refresh', self.run_pipeline)
+        except Exception as e:
+            logger.exception("Error building the news queue: %s", e)
+            
+            # Initialize with fallback headlines if queue is empty
+            if not self.news_queue:
+                logger.warning("Initializing with fallback headlines due to error")
+                self.news_queue = self.get_fallback_headlines()
+                self.serving_fallback = True
+            
+            return json.dumps(self.news_queue)
+
+    def __call__(self, args):
+        """Agent entry point: the AI-relevant part of the shared ranking, refreshed only once it is stale"""
+        try:
+            if self.ranked_at is None or time.time() - self.ranked_at > RANKING_MAX_AGE:
+                self.execute()
+            final_news = []
+            selected = [item for item in self.ranking if item.score][:self.max_news_items]
+            latest = newest(selected)
+            for item in selected:
+                news_item = self.format_news_item(item, len(final_news) + 1, is_latest=item is latest)
+                final_news.append(news_item)
+                logger.debug("News %d: %s", len(final_news), news_item['title'], extra={
+                    'source': news_item['source'],
+                    'score': item.score,
+                })
+            return final_news
+        except Exception as e:
+            logger.exception("Error in news tool: %s", e)
+            return []
+
+    def _get_gemini_model(self):
+        if self._gemini_model is None:
+            with self._client_lock:
+                if self._gemini_model is None:
+                    if not google_api_key:
+                        raise RuntimeError("GOOGLE_API_KEY not set")
+                    import google.generativeai as genai
+                    genai.configure(api_key=google_api_key)
+                    self._gemini_model = genai.GenerativeModel('gemini-1.5-flash')
+        return self._gemini_model
+
+    def categorize_with_gemini(self, title, description=""):
+        """Categorize news using Gemini API, consulting the persistent cache first"""
+        cached = self.category_cache.get(title, description)
+        if cached is not None:
+            return cached
+        return self._categorize_uncached(title, description, priority=VISIBLE) or DEFAULT_CATEGORY
+
+    def _gemini_allowed(self, priority):
+        """Take a Gemini token; visible work waits briefly for one, backfill never does"""
+        return self.gemini_scheduler.acquire(
+            priority, timeout=GEMINI_VISIBLE_MAX_WAIT if priority == VISIBLE else 0.0
+        )
+
+    def _gemini_rate_limited(self, error):
+        """Pause Gemini requests if `error` is a 429; True if it was"""
+        if not is_rate_limited(error):
+            return False
+        logger.warning("Gemini rate limited, pausing for %ss: %s", GEMINI_RATE_LIMIT_BACKOFF, error)
+        self.gemini_scheduler.penalize(GEMINI_RATE_LIMIT_BACKOFF)
+        return True
+
+    def _categorize_uncached(self, title, description="", priority=BACKFILL):
+        """Ask Gemini for a single article's category and cache a valid answer.
+
+        Returns None, without asking, when the quota does not allow a request,
+        and when Gemini fails or answers with no known category; nothing is
+        cached then, so the article is asked about again later.
+        """
+        # The same headline asked for by concurrent callers costs one request
+        return self._gemini_coalescer.do(
+            (title, description), lambda: self._ask_gemini(title, description, priority)
+        )
+
+    def _ask_gemini(self, title, description, priority):
+        if not self._gemini_allowed(priority):
+            return None
+        started = time.perf_counter()
+        try:
+            model = self._get_gemini_model()
+            category_list = "\n".join(f"            - {c}" for c in CATEGORIES)
+            prompt = f"""Analyze this technology news article and categorize it into ONE of these categories:
+{category_list}
+
+            Title: {title}
+            Description: {description}
+
+            Return only the category name, nothing else."""
+
+            response = model.generate_content(prompt)
+            category = match_category(response.text)
+            if category is None:
+                logger.warning("Unexpected category from Gemini: %r", response.text.strip()[:50])
+                return None
+            logger.debug("Gemini categorized %r as %s", title[:50], category)
+            self.category_cache.put(title, description, category)
+            metrics.CATEGORY_LOOKUPS.inc(tier='gemini')
+            return category
+        except Exception as e:
+            if not self._gemini_rate_limited(e):
+                logger.warning("Categorization error: %s", e)
+            return None
+        finally:
+            metrics.CATEGORIZE_LATENCY.observe(time.perf_counter() - started, tier='gemini')
+
+    def categorize_local(self, title, description=""):
+        """Return the local engine's category if it is confident enough, else None"""
+        category, confidence = self.local_categorizer.categorize(title, description)
+        if self.categorizer_mode == 'local':
+            return category or DEFAULT_CATEGORY
+        if category is not None and confidence >= self.local_min_confidence:
+            return category
+        return None
+
+    def categorize_batch(self, articles, priority=BACKFILL):
+        """Categorize many (title, description) pairs with JSON-mode Gemini calls.
+
+        Returns one category per input, in order. Articles the local engine is
+        confident about, and cached ones, never reach the model; the rest are
+        asked about GEMINI_BATCH_SIZE at a time, and any item a batch response
+        leaves out or labels with an unknown category is retried on its own.
+        Gemini requests are made at `priority`. Items left unresolved (no
+        quota, or Gemini failing) come back as None.
+        """
+        categories = [None] * len(articles)
+        for i, (title, description) in enumerate(articles):
+            if self.categorizer_mode != 'gemini':
+                started = time.perf_counter()
+                categories[i] = self.categorize_local(title, description)
+                metrics.CATEGORIZE_LATENCY.observe(time.perf_counter() - started, tier='local')
+                if categories[i] is not None:
+                    metrics.CATEGORY_LOOKUPS.inc(tier='local')
+                    continue
+            started = time.perf_counter()
+            categories[i] = self.category_cache.get(title, description)
+            metrics.CATEGORIZE_LATENCY.observe(time.perf_counter() - started, tier='cache')
+            if categories[i] is not None:
+                metrics.CATEGORY_LOOKUPS.inc(tier='cache')
+        pending = [i for i, category in enumerate(categories) if category is None]
+        if not pending:
+            return categories
+        
+        for start in range(0, len(pending), GEMINI_BATCH_SIZE):
+            batch = pending[start:start + GEMINI_BATCH_SIZE]
+            if len(batch) > 1:
+                if not self._gemini_allowed(priority):
+                    break
+                if not self._ask_gemini_batch(articles, batch, categories):
+                    # Gemini itself is failing: per-item requests would fail the same way
+                    break
+            # Per-item fallback for anything the batch did not resolve, while quota lasts
+            for i in batch:
+                if categories[i] is None:
+                    categories[i] = self._categorize_uncached(*articles[i], priority=priority)
+                    if categories[i] is None:
+                        return categories
+        return categories
+
+    def _ask_gemini_batch(self, articles, batch, categories):
+        """One JSON-mode request for the articles at indices `batch`, filling `categories`.
+
+        Returns False if the request failed outright (rate limit, transport or
+        server error), True if Gemini answered, even when some answers were unusable.
+        """
+        started = time.perf_counter()
+        try:
+            model = self._get_gemini_model()
+            listing = "\n".join(
+                f"{n}. Title: {articles[i][0]}\n   Description: {(articles[i][1] or '')[:300]}"
+                for n, i in enumerate(batch, 1)
+            )
+            prompt = f"""Analyze these {len(batch)} technology news articles and categorize each into ONE of these categories:
+{chr(10).join(f"- {c}" for c in CATEGORIES)}
+
+{listing}
+
+Return a JSON array with one object per article, {{"id": <article number>, "category": <category name>}}."""
+
+            response = model.generate_content(
+                prompt,
+                generation_config={"response_mime_type": "application/json"}
+            )
+            # Answers are matched by article number, never by position
+            for number, category in match_batch_categories(response.text, len(batch)).items():
+                i = batch[number - 1]
+                categories[i] = category
+                self.category_cache.put(articles[i][0], articles[i][1], category)
+                metrics.CATEGORY_LOOKUPS.inc(tier='gemini_batch')
+            logger.info("Gemini batch categorized articles", extra={
+                'resolved': sum(categories[i] is not None for i in batch),
+                'requested': len(batch),
+            })
+            return True
+        except Exception as e:
+            if not self._gemini_rate_limited(e):
+                logger.warning("Batch categorization error: %s", e)
+            return False
+        finally:
+            metrics.CATEGORIZE_LATENCY.observe(time.perf_counter() - started, tier='gemini_batch')
+
+    def categorize_items(self, items, priority=BACKFILL, retry_deferred=False):
+        """Set the category on Articles that do not have one yet.
+
+        Articles Gemini gave no category for (no quota, an error, no usable
+        answer) get the local engine's guess as a provisional category and
+        are deferred;
+        with `retry_deferred`, deferred articles among `items` are asked
+        about again and re-published once resolved.
+        """
+        missing = [
+            item for item in items
+            if not item.category or (retry_deferred and item.key in self._deferred)
+        ]
+        if not missing:
+            return items
+        categories = self.categorize_batch([(item.title, item.description) for item in missing], priority)
+        deferred = 0
+        for item, category in zip(missing, categories):
+            if category is None:
+                if not item.category:
+                    guess, _ = self.local_categorizer.categorize(item.title, item.description)
+                    item.set_category(guess or DEFAULT_CATEGORY)
+                    deferred += 1
+                self._deferred[item.key] = item
+                self._deferred.move_to_end(item.key)
+                continue
+            if self._deferred.pop(item.key, None) is not None and category != item.category:
+                self._recategorized.append(item)
+            if category != item.category:
+                item.set_category(category)
+            logger.debug("Categorized %r as %s", item.title[:50], category)
+        while len(self._deferred) > DEFERRED_CATEGORIZATION_MAX:
+            self._deferred.popitem(last=False)
+        if deferred:
+            metrics.CATEGORY_LOOKUPS.inc(deferred, tier='deferred')
+            logger.info("Gemini quota short or unavailable, categorization deferred", extra={
+                'deferred': deferred,
+                'priority': 'visible' if priority == VISIBLE else 'backfill',
+                'backlog': len(self._deferred),
+            })
+        return items
+
+_news_tool_lock = threading.Lock()
+_news_tool = None
+
+
+def get_news_tool():
+    """The one pipeline per process, shared by the API and the agent's tool, built on first use"""
+    global _news_tool
+    with _news_tool_lock:
+        if _news_tool is None:
+            _news_tool = NewsTool()
+    return _news_tool
+
+
+def __getattr__(name):
+    # Importing this module opens no files; `news_tool_instance` is built when asked for
+    if name == 'news_tool_instance':
+        return get_news_tool()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
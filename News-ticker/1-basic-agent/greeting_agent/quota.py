@@ -0,0 +1,351 @@
+import heapq
+import itertools
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    from . import metrics
+except ImportError:
+    import metrics
+
+logger = logging.getLogger(__name__)
+
+# Request priorities, lower is served first
+VISIBLE = 0   # work for articles the ticker is about to show
+BACKFILL = 1  # everything else
+
+DAY_SECONDS = 24 * 3600
+
+
+def is_rate_limited(error):
+    """True if an upstream error means "too many requests" (NewsAPI or Google API)"""
+    code = error.get_code() if hasattr(error, 'get_code') else getattr(error, 'code', None)
+    return code in (429, 'rateLimited') or type(error).__name__ in ('ResourceExhausted', 'TooManyRequests')
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `capacity`; starts full"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = None
+
+    def _refill(self, now):
+        if self.updated is not None:
+            self.tokens = min(self.capacity, self.tokens + max(0.0, now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, cost, now):
+        """Seconds until `cost` tokens are available"""
+        self._refill(now)
+        deficit = cost - self.tokens
+        if deficit <= 0:
+            return 0.0
+        return deficit / self.rate if self.rate > 0 else float('inf')
+
+    def take(self, cost, now):
+        self._refill(now)
+        self.tokens -= cost
+
+    def drain(self, now):
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0)
+
+
+class DailyBudget:
+    """Requests allowed per UTC day; a `limit` of None is unlimited"""
+
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.used = 0
+        self.day = None
+
+    def _roll(self, now):
+        day = int(now // DAY_SECONDS)
+        if day != self.day:
+            self.day = day
+            self.used = 0
+
+    def remaining(self, now):
+        self._roll(now)
+        return None if self.limit is None else max(0, self.limit - self.used)
+
+    def spend(self, cost, now):
+        self._roll(now)
+        self.used += cost
+
+    def exhaust(self, now):
+        """The upstream says the day's quota is gone, whatever we counted"""
+        self._roll(now)
+        if self.limit is not None:
+            self.used = max(self.used, self.limit)
+
+
+class QuotaLedger:
+    """Quota state shared by every process on the host and kept across restarts.
+
+    One SQLite row per upstream holds the day's spend, the token bucket and
+    any rate-limit pause, in wall-clock time. `update` reads and rewrites a
+    row inside one IMMEDIATE transaction, so concurrent workers, a restarted
+    process and a newly elected refresher all see the same spending.
+    """
+
+    FIELDS = ('day', 'used', 'tokens', 'updated', 'paused_until')
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _db(self):
+        """This process's connection; a connection inherited across fork is never reused"""
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS quota ('
+                ' upstream TEXT PRIMARY KEY,'
+                ' day INTEGER,'
+                ' used INTEGER NOT NULL,'
+                ' tokens REAL,'
+                ' updated REAL,'
+                ' paused_until REAL NOT NULL)'
+            )
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def get(self, upstream):
+        """The stored state of `upstream` as a dict, empty if there is none"""
+        with self._lock:
+            try:
+                row = self._db().execute(
+                    'SELECT day, used, tokens, updated, paused_until FROM quota WHERE upstream = ?', (upstream,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning("Quota ledger unavailable: %s", e)
+                return {}
+        return dict(zip(self.FIELDS, row)) if row is not None else {}
+
+    @contextmanager
+    def update(self, upstream):
+        """Yield the state of `upstream` for changing in place; written back atomically.
+
+        If the database cannot be locked, an empty state is yielded and
+        nothing is written, so callers fall back to their in-memory state.
+        """
+        with self._lock:
+            try:
+                conn = self._db()
+                conn.execute('BEGIN IMMEDIATE')
+            except sqlite3.Error as e:
+                logger.warning("Quota ledger unavailable: %s", e)
+                yield {}
+                return
+            try:
+                row = conn.execute(
+                    'SELECT day, used, tokens, updated, paused_until FROM quota WHERE upstream = ?', (upstream,)
+                ).fetchone()
+                state = dict(zip(self.FIELDS, row)) if row is not None else {}
+                yield state
+                if state:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO quota (upstream, day, used, tokens, updated, paused_until)'
+                        ' VALUES (?, ?, ?, ?, ?, ?)',
+                        (upstream, *(state[field] for field in self.FIELDS))
+                    )
+                conn.execute('COMMIT')
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                raise
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+class UpstreamScheduler:
+    """Rate limit, daily budget and priority queue for one metered upstream.
+
+    `acquire` grants a request or refuses it. Refills come from a token
+    bucket (`per_minute`, bursts up to `burst`); the day's total is capped
+    by `daily_limit`, of which the last `reserve` share is kept for VISIBLE
+    requests. Callers that are willing to wait are served in priority
+    order, so backfill never takes the token a visible request is waiting
+    for. When the upstream itself reports a rate limit, `penalize` pauses
+    every request for its retry-after. Each outcome is counted in
+    `news_upstream_requests_total`.
+
+    With a `ledger` (QuotaLedger), the bucket, the day's spend and any pause
+    are read from and written back to it around every decision, so they
+    survive restarts and are shared by every process using the same file.
+    Priority ordering still only applies within one process.
+    """
+
+    def __init__(self, name, per_minute, daily_limit=None, burst=None, reserve=0.0, ledger=None):
+        self.name = name
+        self.bucket = TokenBucket(per_minute / 60.0, burst if burst is not None else per_minute)
+        self.budget = DailyBudget(daily_limit)
+        self.reserve = int(daily_limit * reserve) if daily_limit else 0
+        self.paused_until = 0.0  # wall-clock time
+        self.ledger = ledger
+
+        self._cond = threading.Condition()
+        self._waiters = []  # heap of (priority, seq)
+        self._counter = itertools.count()
+
+    def _load(self, state):
+        if state:
+            self.budget.day, self.budget.used = state['day'], state['used']
+            self.bucket.tokens = min(self.bucket.capacity, state['tokens'])
+            self.bucket.updated = state['updated']
+            self.paused_until = state['paused_until']
+
+    def _dump(self, state):
+        state.update(
+            day=self.budget.day, used=self.budget.used, tokens=self.bucket.tokens,
+            updated=self.bucket.updated, paused_until=self.paused_until,
+        )
+
+    @contextmanager
+    def _shared(self):
+        """Bring in the ledger's state for one decision and write the outcome back"""
+        if self.ledger is None:
+            yield
+            return
+        with self.ledger.update(self.name) as state:
+            self._load(state)
+            yield
+            self._dump(state)
+
+    def _refusal(self, priority, cost, now):
+        """Why a request cannot go out right now, or None if it can"""
+        remaining = self.budget.remaining(now)
+        if remaining is not None:
+            if remaining < cost:
+                return 'exhausted'
+            if priority > VISIBLE and remaining - cost < self.reserve:
+                return 'reserved'
+        if now < self.paused_until or self.bucket.wait_time(cost, now) > 0:
+            return 'throttled'
+        return None
+
+    def acquire(self, priority=BACKFILL, cost=1, timeout=0.0):
+        """True if `cost` requests may be sent now, waiting up to `timeout` seconds for tokens"""
+        deadline = time.monotonic() + timeout
+        entry = (priority, next(self._counter))
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    with self._shared():
+                        now = time.time()
+                        refusal = self._refusal(priority, cost, now)
+                        if refusal is None and self._waiters[0] == entry:
+                            self.bucket.take(cost, now)
+                            self.budget.spend(cost, now)
+                        wait = max(self.paused_until - now, self.bucket.wait_time(cost, now))
+                    if refusal in ('exhausted', 'reserved'):
+                        # Waiting does not bring budget back
+                        return self._record(refusal)
+                    if refusal is None and self._waiters[0] == entry:
+                        return self._record('allowed')
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return self._record('throttled')
+                    self._cond.wait(min(remaining, wait) if refusal == 'throttled' else remaining)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def _record(self, outcome):
+        metrics.UPSTREAM_REQUESTS.inc(upstream=self.name, outcome=outcome)
+        return outcome == 'allowed'
+
+    def penalize(self, retry_after):
+        """The upstream answered "rate limited": send nothing for `retry_after` seconds"""
+        with self._cond, self._shared():
+            now = time.time()
+            self.paused_until = max(self.paused_until, now + retry_after)
+            self.bucket.drain(now)
+        metrics.UPSTREAM_REQUESTS.inc(upstream=self.name, outcome='rate_limited')
+
+    def exhaust(self):
+        """The upstream reports its daily quota used up"""
+        with self._cond, self._shared():
+            self.budget.exhaust(time.time())
+        metrics.UPSTREAM_REQUESTS.inc(upstream=self.name, outcome='rate_limited')
+
+    def to_dict(self):
+        with self._cond:
+            if self.ledger is not None:
+                self._load(self.ledger.get(self.name))
+            now = time.time()
+            self.bucket._refill(now)
+            remaining = self.budget.remaining(now)  # rolls over to today first
+            return {
+                'upstream': self.name,
+                'daily_limit': self.budget.limit,
+                'used_today': self.budget.used,
+                'remaining_today': remaining,
+                'reserved_for_visible': self.reserve,
+                'tokens': round(self.bucket.tokens, 3),
+                'paused_for': round(max(0.0, self.paused_until - now), 1),
+                'resets_in': round(DAY_SECONDS - now % DAY_SECONDS),
+            }
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class Coalescer:
+    """Concurrent calls with the same key share one in-flight execution.
+
+    The first caller runs `func`; anyone arriving with that key before it
+    returns waits and receives the same result (or exception). `name`
+    labels the `coalesced` outcome in news_upstream_requests_total.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            metrics.UPSTREAM_REQUESTS.inc(upstream=self.name, outcome='coalesced')
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
@@ -0,0 +1,102 @@
+import re
+import time
+
+try:
+    from .local_categorizer import TITLE_WEIGHT
+except ImportError:
+    from local_categorizer import TITLE_WEIGHT
+
+# Weighted AI-relevance keywords, same syntax as the categorizer's: a trailing
+# '*' matches any word starting with the keyword, everything else whole words
+RELEVANCE_KEYWORDS = {
+    'ai': 2, 'artificial intelligence': 3, 'machine learning': 3, 'deep learning': 3,
+    'neural network*': 3, 'chatgpt': 3, 'gpt*': 2, 'llm*': 3, 'language model*': 3,
+    'openai': 3, 'anthropic': 3, 'claude': 2, 'gemini': 2, 'copilot': 2, 'robot*': 1,
+    'automation': 1, 'computer vision': 2, 'nlp': 2, 'autonomous': 1, 'ml': 1,
+    'generative': 2, 'deepmind': 3, 'ai model*': 2, 'ai agent*': 2, 'chatbot*': 2,
+}
+
+# Word characters, as the categorizer tokenizes them ("gpt-4" is one word)
+_WORD_CHARS = 'a-z0-9+#\\-'
+_SEPARATOR_RE = re.compile(f'[^{_WORD_CHARS}]+')
+
+
+class RecencyRanker:
+    """Newest first, ignoring content"""
+
+    name = 'recency'
+
+    def score(self, article):
+        return 0.0
+
+    def rank(self, articles, now=None):
+        return sorted(articles, key=lambda article: article.published, reverse=True)
+
+
+class KeywordRanker:
+    """AI relevance from weighted keywords, decayed by age.
+
+    `score` is the static part (title matches count TITLE_WEIGHT times more
+    than description matches, each keyword once per field) and is computed
+    once per article. `rank` orders by (1 + score) halved every
+    `half_life_hours`, so an article with no keyword still ranks by age.
+
+    All keywords are compiled into one regular expression, longest first,
+    so a field is scanned once in C. A match also credits every shorter
+    keyword it implies ("ai model" is "ai" too), which a single
+    alternation would otherwise hide.
+    """
+
+    name = 'keywords'
+
+    def __init__(self, keywords=None, half_life_hours=6.0):
+        keywords = keywords or RELEVANCE_KEYWORDS
+        self.half_life = half_life_hours * 3600.0
+        phrases = sorted(
+            ((keyword.rstrip('*'), keyword.endswith('*'), weight) for keyword, weight in keywords.items()),
+            key=lambda phrase: -len(phrase[0])
+        )
+        alternatives = []
+        for text, prefix, _ in phrases:
+            body = f'[^{_WORD_CHARS}]+'.join(re.escape(word) for word in text.split())
+            alternatives.append(body if prefix else f'{body}(?![{_WORD_CHARS}])')
+        self._pattern = re.compile(f'(?<![{_WORD_CHARS}])(?:{"|".join(alternatives)})')
+        # matched phrase -> {keyword phrase: weight} for every keyword matching there
+        self._implied = {
+            text: {
+                other: other_weight for other, other_prefix, other_weight in phrases
+                if other == text or (text.startswith(other) and (other_prefix or text[len(other)] == ' '))
+            }
+            for text, _, _ in phrases
+        }
+
+    def score(self, article):
+        total = 0.0
+        for text, factor in ((article.title, TITLE_WEIGHT), (article.description, 1)):
+            if not text:
+                continue
+            matched = {}
+            for phrase in set(self._pattern.findall(text.lower())):
+                implied = self._implied.get(phrase) or self._implied[_SEPARATOR_RE.sub(' ', phrase)]
+                matched.update(implied)
+            total += factor * sum(matched.values())
+        return total
+
+    def rank(self, articles, now=None):
+        now = time.time() if now is None else now
+
+        def key(article):
+            if article.score is None:
+                article.score = self.score(article)
+            age = max(0.0, now - article.published)
+            return ((1.0 + article.score) * 0.5 ** (age / self.half_life), article.published)
+        return sorted(articles, key=key, reverse=True)
+
+
+def get_ranker(name, half_life_hours=6.0):
+    """The ranker configured by name ("keywords" or "recency")"""
+    if name == 'keywords':
+        return KeywordRanker(half_life_hours=half_life_hours)
+    if name == 'recency':
+        return RecencyRanker()
+    raise ValueError(f"unknown ranker {name!r}, expected 'keywords' or 'recency'")
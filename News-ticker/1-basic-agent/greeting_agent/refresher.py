@@ -0,0 +1,435 @@
+import hashlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timezone
+
+try:
+    from . import metrics
+    from .profiler import SamplingProfiler
+except ImportError:
+    import metrics
+    from profiler import SamplingProfiler
+
+logger = logging.getLogger(__name__)
+
+# Seconds between background rebuilds of the news queue
+DEFAULT_REFRESH_INTERVAL = float(os.getenv('NEWS_REFRESH_INTERVAL', '60'))
+
+# Number of past snapshots kept so streaming clients can receive deltas
+SNAPSHOT_HISTORY = 16
+
+# Shared-store mode: seconds between lease renewals / store polls, and how long
+# a lease outlives its last renewal before another worker may take over
+STORE_POLL_INTERVAL = float(os.getenv('NEWS_STORE_POLL_INTERVAL', '1'))
+LEADER_LEASE_TTL = float(os.getenv('NEWS_LEADER_LEASE_TTL', '90'))
+
+# Warm-start files older than this many seconds are ignored
+WARM_START_MAX_AGE = float(os.getenv('NEWS_WARM_START_MAX_AGE', str(24 * 3600)))
+
+# Immutable, pre-serialized view of the news queue served by /api/news.
+# `body` is the exact JSON payload, `etag` is derived from it and only changes
+# when the content does, `version` increases by one on every content change.
+NewsSnapshot = namedtuple('NewsSnapshot', ['body', 'etag', 'last_modified', 'created_at', 'version'])
+
+
+def build_snapshot(payload, previous=None):
+    """Serialize a news payload into a snapshot, reusing `previous` if unchanged"""
+    if isinstance(payload, str):
+        body = payload.encode('utf-8')
+    elif isinstance(payload, bytes):
+        body = payload
+    else:
+        body = json.dumps(payload).encode('utf-8')
+
+    etag = hashlib.sha1(body).hexdigest()
+    if previous is not None and previous.etag == etag:
+        return previous
+
+    return NewsSnapshot(
+        body=body,
+        etag=etag,
+        last_modified=datetime.now(timezone.utc).replace(microsecond=0),
+        created_at=time.time(),
+        version=(previous.version + 1) if previous is not None else 1,
+    )
+
+
+def event_id(snapshot):
+    """Stream event id for a snapshot: its version plus the start of its etag.
+
+    Versions restart at 1 when the server restarts cold, so the etag part
+    keeps an id from before the restart from matching a different snapshot.
+    """
+    return f'{snapshot.version}-{snapshot.etag[:16]}'
+
+
+def parse_event_id(value):
+    """(version, etag prefix) from an `event_id`, or None for anything else"""
+    version, _, etag = (value or '').partition('-')
+    if not version.isdigit() or not etag:
+        return None
+    return int(version), etag
+
+
+def item_key(item):
+    """Identity of a queue item across snapshots"""
+    return item.get('url') or item.get('title', '')
+
+
+def _content(item):
+    # `id` follows the item's position, so it is not content
+    return {k: v for k, v in item.items() if k != 'id'}
+
+
+def build_delta(base, snapshot):
+    """Describe `snapshot` relative to `base` as a compact JSON delta.
+
+    `keys` is the new order of item keys; `items` holds the full item for every
+    key that is new or whose content changed (including gaining or losing
+    `isLatest`). Clients rebuild the list from `keys`, reuse their copy of
+    unchanged items and renumber `id` by position.
+    """
+    old = {item_key(item): _content(item) for item in json.loads(base.body)}
+    new_items = json.loads(snapshot.body)
+    changed = {}
+    for item in new_items:
+        key = item_key(item)
+        if old.get(key) != _content(item):
+            changed[key] = item
+    return json.dumps({
+        'version': snapshot.version,
+        'base': base.version,
+        'keys': [item_key(item) for item in new_items],
+        'items': changed,
+    }).encode('utf-8')
+
+
+class NewsRefresher:
+    """Rebuilds the news queue on a fixed interval in a daemon thread.
+
+    Readers only ever touch `self.snapshot`, which is swapped atomically after
+    each refresh, so serving a request never waits on upstream sources.
+
+    With a shared `store` (see snapshot_store.SnapshotStore) several worker
+    processes cooperate: the one holding the refresher lease refreshes and
+    writes each new snapshot to the store, the others only copy the latest
+    snapshot out of it. Upstream calls therefore do not grow with the number
+    of workers.
+
+    With a `warm_start_path`, every new snapshot (and the article index) is
+    also written to that file, and `start` serves it straight away so the
+    first request after a restart does not wait for upstream sources.
+    """
+
+    def __init__(self, tool, interval=None, store=None, worker_id=None, warm_start_path=None):
+        self.tool = tool
+        self.interval = interval if interval is not None else DEFAULT_REFRESH_INTERVAL
+        self.snapshot = None
+        self.last_refresh = None
+        self.last_error = None
+
+        self.store = store
+        self.worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}'
+        self.is_leader = store is None
+        self._shared_index_version = None  # article index version last written to / read from the store
+        self.warm_start_path = warm_start_path
+        self._saved = None  # (snapshot version, index version) last written to the warm-start file
+
+        self._refresh_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        # Streaming support: recent snapshots by version and a condition
+        # that wakes waiting clients whenever a new version is published
+        self._history = OrderedDict()
+        self._changed = threading.Condition()
+        self._events = {}  # (delta base version or None, current version) -> (event, data)
+
+        # Optional one-shot sampling profile of the next refresh
+        self._profile_next = threading.Event()
+        self.last_profile = None
+
+        metrics.REGISTRY.gauge(
+            'news_snapshot_age_seconds', 'Seconds since the served snapshot was built'
+        ).callback = self.snapshot_age
+        metrics.REGISTRY.gauge(
+            'news_snapshot_version', 'Version of the served snapshot'
+        ).callback = lambda: self.snapshot.version if self.snapshot is not None else None
+        metrics.REGISTRY.gauge(
+            'news_refresher_leader', 'Whether this worker refreshes from upstream (1) or follows the store (0)'
+        ).callback = lambda: int(self.is_leader)
+
+    def start(self):
+        """Start the worker thread (safe to call more than once)"""
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if self.snapshot is None:
+                self.warm_start()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='news-refresher', daemon=True)
+            self._thread.start()
+            logger.info("News refresher started", extra={'interval': self.interval})
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def refresh(self):
+        """Run one refresh cycle and publish the resulting snapshot"""
+        with self._refresh_lock:
+            profiler = None
+            if self._profile_next.is_set():
+                self._profile_next.clear()
+                profiler = SamplingProfiler(threading.get_ident()).start()
+            started = time.perf_counter()
+            try:
+                if self.store is not None:
+                    # Continue from the shared version history, not our own
+                    self.sync()
+                payload = self.tool.execute()
+                if self.snapshot is not None and getattr(self.tool, 'serving_fallback', False):
+                    # No articles this time (network down, every feed late): a real
+                    # snapshot, e.g. from a warm start, beats made-up headlines
+                    logger.warning("Refresh found no articles, keeping the served snapshot",
+                                   extra={'version': self.snapshot.version})
+                else:
+                    snapshot = build_snapshot(payload, self.snapshot)
+                    if self.store is None or self._share(snapshot):
+                        self._publish(snapshot)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logger.exception("Background refresh failed: %s", e)
+            finally:
+                metrics.REFRESH_DURATION.observe(time.perf_counter() - started)
+                if profiler is not None:
+                    self.last_profile = profiler.stop()
+                    logger.info("Profiled refresh", extra={
+                        'seconds': round(profiler.duration, 3),
+                        'samples': sum(profiler.samples.values()),
+                        'top': [f'{name} {share:.0%}' for name, share in profiler.top_functions(5)],
+                    })
+                self.last_refresh = time.time()
+                if self.store is not None:
+                    self._record_refresh()
+                elif self.warm_start_path and self.snapshot is not None:
+                    self._save_warm_start()
+                if self.snapshot is not None:
+                    self._ready.set()
+            return self.snapshot
+
+    def warm_start(self):
+        """Serve the last snapshot a previous run left behind, if there is one"""
+        try:
+            if self.store is not None:
+                # The shared store already outlives restarts
+                self.sync()
+            elif self.warm_start_path:
+                self._load_warm_start()
+        except Exception as e:
+            logger.warning("Warm start failed, waiting for the first refresh: %s", e)
+        return self.snapshot
+
+    def _load_warm_start(self):
+        try:
+            with open(self.warm_start_path, encoding='utf-8') as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return
+        age = time.time() - saved['created_at']
+        if age > WARM_START_MAX_AGE:
+            logger.info("Warm-start snapshot too old, ignoring it", extra={'age': round(age)})
+            return
+        index = getattr(self.tool, 'article_index', None)
+        if index is not None and saved.get('articles') is not None:
+            index.load(saved['articles'], version=saved.get('articles_version'))
+        self._publish(NewsSnapshot(
+            body=saved['body'].encode('utf-8'),
+            etag=saved['etag'],
+            last_modified=datetime.fromtimestamp(saved['last_modified'], timezone.utc),
+            created_at=saved['created_at'],
+            version=saved['version'],
+        ))
+        self._ready.set()
+        logger.info("Serving warm-start snapshot", extra={'version': saved['version'], 'age': round(age)})
+
+    def _save_warm_start(self):
+        """Write the served snapshot and article index atomically, when either changed"""
+        index = getattr(self.tool, 'article_index', None)
+        state = (self.snapshot.version, index.version if index is not None else None)
+        if state == self._saved:
+            return
+        saved = {
+            'version': self.snapshot.version,
+            'body': self.snapshot.body.decode('utf-8'),
+            'etag': self.snapshot.etag,
+            'last_modified': self.snapshot.last_modified.timestamp(),
+            'created_at': self.snapshot.created_at,
+        }
+        if index is not None:
+            saved['articles'] = index.export()
+            saved['articles_version'] = index.version
+        tmp_path = f'{self.warm_start_path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(saved, f)
+            os.replace(tmp_path, self.warm_start_path)
+            self._saved = state
+        except OSError as e:
+            logger.warning("Could not write warm-start snapshot: %s", e)
+
+    def _share(self, snapshot):
+        """Write a new snapshot to the store; False if another worker already wrote that version"""
+        if snapshot is self.snapshot:
+            return True
+        written = self.store.publish(
+            snapshot.version, snapshot.body, snapshot.etag,
+            snapshot.last_modified.timestamp(), snapshot.created_at
+        )
+        if not written:
+            logger.info("Snapshot version already published by another worker",
+                        extra={'version': snapshot.version})
+            self.sync()
+        return written
+
+    def _record_refresh(self):
+        try:
+            self.store.put_meta('last_refresh', self.last_refresh)
+            if hasattr(self.tool, 'source_status'):
+                self.store.put_meta('sources', self.tool.source_status())
+            index = getattr(self.tool, 'article_index', None)
+            if index is not None and index.version != self._shared_index_version:
+                self.store.put_meta('articles', index.export())
+                self.store.put_meta('articles_version', index.version)
+                self._shared_index_version = index.version
+        except Exception as e:
+            logger.warning("Could not record refresh in the snapshot store: %s", e)
+
+    def sync(self):
+        """Adopt the newest snapshot in the shared store if it is not the one being served"""
+        self._sync_index()
+        latest = self.store.latest_version()
+        if latest is None or (self.snapshot is not None and self.snapshot.version == latest):
+            return self.snapshot
+        row = self.store.load(latest)
+        if row is not None:
+            version, body, etag, last_modified, created_at = row
+            self._publish(NewsSnapshot(
+                body=bytes(body),
+                etag=etag,
+                last_modified=datetime.fromtimestamp(last_modified, timezone.utc),
+                created_at=created_at,
+                version=version,
+            ))
+            self._ready.set()
+        return self.snapshot
+
+    def _publish(self, snapshot):
+        if snapshot is self.snapshot:
+            return
+        with self._changed:
+            self.snapshot = snapshot
+            self._history[snapshot.version] = snapshot
+            while len(self._history) > SNAPSHOT_HISTORY:
+                self._history.popitem(last=False)
+            self._events = {}
+            self._changed.notify_all()
+
+    def wait_for_change(self, last_event_id, timeout=None):
+        """Block until the served snapshot is not the one `last_event_id` names; None on timeout"""
+        with self._changed:
+            changed = self._changed.wait_for(
+                lambda: self.snapshot is not None and event_id(self.snapshot) != last_event_id, timeout
+            )
+            return self.snapshot if changed else None
+
+    def stream_event(self, last_event_id, snapshot):
+        """Pre-serialized (event, data) bringing a client at `last_event_id` up to `snapshot`.
+
+        Clients whose snapshot is still in the history (same version and
+        etag) get a "delta" event, everyone else a full "snapshot". Results
+        are shared between clients on the same base; every client without
+        one shares the single full-snapshot entry.
+        """
+        client = parse_event_id(last_event_id)
+        base = self._history.get(client[0]) if client is not None else None
+        if base is not None and (base.etag[:16] != client[1] or base.version == snapshot.version):
+            base = None
+        cache_key = (base.version if base is not None else None, snapshot.version)
+        event = self._events.get(cache_key)
+        if event is None:
+            if base is not None:
+                event = ('delta', build_delta(base, snapshot))
+            else:
+                event = ('snapshot', json.dumps({
+                    'version': snapshot.version,
+                    'items': json.loads(snapshot.body),
+                }).encode('utf-8'))
+            self._events[cache_key] = event
+        return event
+
+    def profile_next_refresh(self):
+        """Capture a sampling profile of the next refresh into `last_profile`"""
+        self._profile_next.set()
+
+    def snapshot_age(self):
+        if self.snapshot is None:
+            return None
+        return time.time() - self.snapshot.created_at
+
+    def get_snapshot(self, timeout=None):
+        """Return the current snapshot, waiting up to `timeout` for the first one"""
+        if self.snapshot is None:
+            self._ready.wait(timeout)
+        return self.snapshot
+
+    def _run(self):
+        if self.store is not None:
+            self._run_shared()
+            return
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self.refresh()
+            elapsed = time.monotonic() - started
+            self._stop.wait(max(0.0, self.interval - elapsed))
+
+    def _sync_index(self):
+        """Load the leader's article index so followers can answer queries too"""
+        index = getattr(self.tool, 'article_index', None)
+        if index is None:
+            return
+        version = self.store.get_meta('articles_version')
+        if version is not None and version != self._shared_index_version:
+            index.load(self.store.get_meta('articles') or [], version=version)
+            self._shared_index_version = version
+
+    def _run_shared(self):
+        """Refresh while holding the lease, otherwise follow the shared store"""
+        while not self._stop.is_set():
+            try:
+                leader = self.store.acquire_lease(self.worker_id, LEADER_LEASE_TTL)
+                if leader != self.is_leader:
+                    self.is_leader = leader
+                    logger.info("Refresher lease %s", 'acquired' if leader else 'lost',
+                                extra={'worker': self.worker_id})
+                # The schedule is shared too, so a new leader does not refresh early
+                last_refresh = self.store.get_meta('last_refresh') or 0
+                if leader and time.time() - last_refresh >= self.interval:
+                    self.refresh()
+                else:
+                    self.sync()
+            except Exception as e:
+                logger.exception("Snapshot store error: %s", e)
+            self._stop.wait(STORE_POLL_INTERVAL)
+        if self.is_leader:
+            self.store.release_lease(self.worker_id)
+            self.is_leader = False
@@ -0,0 +1,144 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class SnapshotStore:
+    """News snapshots and a refresher lease shared by every worker process.
+
+    Backed by one SQLite file in WAL mode, so any number of processes on the
+    host can read while the elected refresher writes. The lease is a single
+    row: whoever holds an unexpired lease refreshes from upstream, everyone
+    else only reads snapshots. A holder that dies simply stops renewing and
+    another worker takes over once `expires_at` passes.
+    """
+
+    def __init__(self, path, history=16):
+        self.path = path
+        self.history = history
+
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        with self._lock:
+            self._db()
+
+    def _db(self):
+        """This process's connection; a connection inherited across fork is never reused"""
+        if self._conn is None or self._pid != os.getpid():
+            # Autocommit; writes open their own IMMEDIATE transactions
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS snapshots ('
+                ' version INTEGER PRIMARY KEY,'
+                ' body BLOB NOT NULL,'
+                ' etag TEXT NOT NULL,'
+                ' last_modified REAL NOT NULL,'
+                ' created_at REAL NOT NULL)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS lease ('
+                ' name TEXT PRIMARY KEY,'
+                ' holder TEXT NOT NULL,'
+                ' expires_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def acquire_lease(self, holder, ttl, name='refresher'):
+        """Take or renew the lease for `holder`; False while another holder's lease is live"""
+        now = time.time()
+        with self._lock:
+            conn = self._db()
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                row = conn.execute(
+                    'SELECT holder, expires_at FROM lease WHERE name = ?', (name,)
+                ).fetchone()
+                if row is not None and row[0] != holder and row[1] > now:
+                    conn.execute('ROLLBACK')
+                    return False
+                conn.execute(
+                    'INSERT OR REPLACE INTO lease (name, holder, expires_at) VALUES (?, ?, ?)',
+                    (name, holder, now + ttl)
+                )
+                conn.execute('COMMIT')
+                return True
+            except sqlite3.OperationalError:
+                # Busy past the timeout: behave as if someone else holds it
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                return False
+
+    def release_lease(self, holder, name='refresher'):
+        with self._lock:
+            self._db().execute('DELETE FROM lease WHERE name = ? AND holder = ?', (name, holder))
+
+    def lease_holder(self, name='refresher'):
+        with self._lock:
+            row = self._db().execute(
+                'SELECT holder, expires_at FROM lease WHERE name = ?', (name,)
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return row[0]
+
+    def publish(self, version, body, etag, last_modified, created_at):
+        """Store a snapshot; False if that version was already written by another holder"""
+        with self._lock:
+            conn = self._db()
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                cursor = conn.execute(
+                    'INSERT OR IGNORE INTO snapshots (version, body, etag, last_modified, created_at)'
+                    ' VALUES (?, ?, ?, ?, ?)',
+                    (version, body, etag, last_modified, created_at)
+                )
+                conn.execute('DELETE FROM snapshots WHERE version <= ?', (version - self.history,))
+                conn.execute('COMMIT')
+                return cursor.rowcount == 1
+            except sqlite3.OperationalError:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                raise
+
+    def latest_version(self):
+        with self._lock:
+            row = self._db().execute('SELECT MAX(version) FROM snapshots').fetchone()
+        return row[0]
+
+    def load(self, version=None):
+        """(version, body, etag, last_modified, created_at) for `version`, or the latest"""
+        with self._lock:
+            if version is None:
+                return self._db().execute(
+                    'SELECT version, body, etag, last_modified, created_at'
+                    ' FROM snapshots ORDER BY version DESC LIMIT 1'
+                ).fetchone()
+            return self._db().execute(
+                'SELECT version, body, etag, last_modified, created_at FROM snapshots WHERE version = ?',
+                (version,)
+            ).fetchone()
+
+    def put_meta(self, key, value):
+        """Store a JSON-serializable value for other workers (e.g. source status)"""
+        with self._lock:
+            self._db().execute(
+                'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, json.dumps(value, default=str))
+            )
+
+    def get_meta(self, key):
+        with self._lock:
+            row = self._db().execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
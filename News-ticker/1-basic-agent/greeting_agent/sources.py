@@ -0,0 +1,134 @@
+import json
+import threading
+import time
+
+DEFAULT_SOURCE_SETTINGS = {
+    'weight': 1.0,
+    'poll_interval': 300,
+    'min_interval': 60,
+    'max_interval': 3600,
+    'quota': 2,
+    'enabled': True,
+}
+
+# Multiplier applied to a source's interval each time a poll finds nothing new
+BACKOFF_FACTOR = 1.5
+# Smoothing for the observed gap between updates (higher reacts faster)
+GAP_SMOOTHING = 0.5
+
+
+class Source:
+    """One feed plus its adaptive polling state.
+
+    `interval` starts at `poll_interval`. When a poll finds new entries the
+    interval moves to half the smoothed gap between observed updates; when it
+    finds nothing it backs off by BACKOFF_FACTOR. Both stay within
+    [min_interval, max_interval].
+    """
+
+    def __init__(self, name, url, weight=1.0, poll_interval=300, min_interval=60,
+                 max_interval=3600, quota=2, enabled=True):
+        self.name = name
+        self.url = url
+        self.weight = float(weight)
+        self.poll_interval = float(poll_interval)
+        self.min_interval = float(min_interval)
+        self.max_interval = float(max_interval)
+        self.quota = int(quota)
+        self.enabled = bool(enabled)
+
+        self.interval = self._clamp(self.poll_interval)
+        self.next_poll = 0.0
+        self.last_poll = None
+        self.last_change = None
+        self.update_gap = None  # smoothed seconds between observed updates
+        self.polls = 0
+        self.changes = 0
+
+    def _clamp(self, seconds):
+        return max(self.min_interval, min(self.max_interval, seconds))
+
+    def is_due(self, now):
+        return self.enabled and now >= self.next_poll
+
+    def record_poll(self, changed, now):
+        self.polls += 1
+        self.last_poll = now
+        if changed:
+            self.changes += 1
+            if self.last_change is not None:
+                gap = now - self.last_change
+                self.update_gap = gap if self.update_gap is None else (
+                    GAP_SMOOTHING * gap + (1 - GAP_SMOOTHING) * self.update_gap
+                )
+                self.interval = self._clamp(self.update_gap / 2)
+            self.last_change = now
+        else:
+            self.interval = self._clamp(self.interval * BACKOFF_FACTOR)
+        self.next_poll = now + self.interval
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'url': self.url,
+            'weight': self.weight,
+            'quota': self.quota,
+            'enabled': self.enabled,
+            'interval': self.interval,
+            'next_poll_in': max(0.0, self.next_poll - time.time()),
+            'polls': self.polls,
+            'changes': self.changes,
+        }
+
+
+class SourceRegistry:
+    """All configured feeds, loaded from a JSON file.
+
+    The file has an optional "defaults" object and a "sources" list; each
+    source needs "name" and "url" and may override any default.
+    """
+
+    def __init__(self, sources=()):
+        self.sources = list(sources)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path) as f:
+            config = json.load(f)
+        defaults = dict(DEFAULT_SOURCE_SETTINGS, **config.get('defaults', {}))
+        sources = []
+        seen_urls = set()
+        for entry in config.get('sources', []):
+            settings = dict(defaults, **entry)
+            if settings['url'] in seen_urls:
+                continue
+            seen_urls.add(settings['url'])
+            sources.append(Source(**{k: settings[k] for k in ('name', 'url', *DEFAULT_SOURCE_SETTINGS)}))
+        return cls(sources)
+
+    @classmethod
+    def from_feeds(cls, feeds, **settings):
+        """Build a registry from (url, name) pairs, e.g. for benchmarks"""
+        return cls(Source(name, url, **settings) for url, name in feeds)
+
+    def due(self, now=None):
+        """Enabled sources whose poll time has come, highest weight first"""
+        now = time.time() if now is None else now
+        with self._lock:
+            due = [source for source in self.sources if source.is_due(now)]
+        due.sort(key=lambda source: source.weight, reverse=True)
+        return due
+
+    def enabled(self):
+        return [source for source in self.sources if source.enabled]
+
+    def record_poll(self, source, changed, now=None):
+        with self._lock:
+            source.record_poll(changed, time.time() if now is None else now)
+
+    def __iter__(self):
+        return iter(self.sources)
+
+    def __len__(self):
+        return len(self.sources)
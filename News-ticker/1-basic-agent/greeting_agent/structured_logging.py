@@ -0,0 +1,56 @@
+import json
+import logging
+import os
+import time
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and any `extra` fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class KeyValueFormatter(logging.Formatter):
+    """Human-readable lines with `extra` fields appended as key=value pairs"""
+
+    def format(self, record):
+        line = '%s %-7s %s: %s' % (
+            time.strftime('%H:%M:%S', time.localtime(record.created)),
+            record.levelname, record.name, record.getMessage()
+        )
+        fields = [
+            f'{key}={value}' for key, value in vars(record).items()
+            if key not in _RECORD_FIELDS and not key.startswith('_')
+        ]
+        if fields:
+            line += ' ' + ' '.join(fields)
+        if record.exc_info:
+            line += '\n' + self.formatException(record.exc_info)
+        return line
+
+
+def configure_logging(level=None, fmt=None):
+    """Configure the root logger from LOG_LEVEL (default INFO) and LOG_FORMAT (text or json)"""
+    level = (level or os.getenv('LOG_LEVEL', 'INFO')).upper()
+    fmt = (fmt or os.getenv('LOG_FORMAT', 'text')).lower()
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter() if fmt == 'json' else KeyValueFormatter())
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level)
@@ -0,0 +1,48 @@
+from article_index import ArticleIndex
+
+NOW = 1_750_000_000
+
+
+def pages(index, limit=2):
+    keys, cursor = [], None
+    while True:
+        payloads, cursor = index.query(limit=limit, cursor=cursor)
+        keys.extend(payloads)
+        if cursor is None:
+            return keys
+
+
+def pages_from(index, cursor):
+    keys = []
+    while cursor is not None:
+        payloads, cursor = index.query(limit=2, cursor=cursor)
+        keys.extend(payloads)
+    return keys
+
+
+def test_cursor_from_one_process_pages_correctly_after_load():
+    leader = ArticleIndex()
+    # Same timestamp for every article, so only the sequence number orders them
+    for n in range(5):
+        leader.add(f'k{n}', NOW, 'Gaming', ['Wire'], f'k{n}')
+    first_page, cursor = leader.query(limit=2)
+
+    follower = ArticleIndex()
+    follower.add('local-only', NOW - 60, 'Gaming', ['Wire'], 'local-only')
+    follower.load(leader.export())
+    rest = pages_from(follower, cursor)
+    assert first_page + rest == pages(leader)
+    assert len(set(first_page + rest)) == 5
+
+
+def test_load_keeps_new_sequence_numbers_after_loaded_ones():
+    index = ArticleIndex()
+    index.load([['a', NOW, 'Gaming', ['Wire'], 'a', 7]])
+    index.add('b', NOW, 'Gaming', ['Wire'], 'b')
+    assert index._records['b'].seq == 8
+
+
+def test_load_accepts_exports_without_sequence_numbers():
+    index = ArticleIndex()
+    index.load([['a', NOW, 'Gaming', ['Wire'], 'a'], ['b', NOW + 1, 'Gaming', ['Wire'], 'b']])
+    assert pages(index) == ['b', 'a']
@@ -0,0 +1,89 @@
+import json
+import re
+
+import pytest
+
+import news_tool
+from article import Article
+from news_tool import match_batch_categories
+
+
+def answer(*items):
+    return json.dumps([{'id': number, 'category': category} for number, category in items])
+
+
+def test_answers_match_by_id_not_position():
+    text = answer((3, 'Gaming'), (1, 'Cybersecurity'))
+    assert match_batch_categories(text, 3) == {1: 'Cybersecurity', 3: 'Gaming'}
+
+
+def test_dropped_and_extra_items_do_not_shift_categories():
+    text = answer((1, 'Gaming'), (3, 'Cybersecurity'), (4, 'Innovation'))
+    assert match_batch_categories(text, 3) == {1: 'Gaming', 3: 'Cybersecurity'}
+
+
+def test_positional_and_ambiguous_answers_are_rejected():
+    assert match_batch_categories(json.dumps(['Gaming', 'Cybersecurity']), 2) == {}
+    assert match_batch_categories(answer((1, 'Gaming'), (1, 'Innovation')), 2) == {}
+    assert match_batch_categories(answer((1, 'Not a category')), 1) == {}
+
+
+class ScriptedModel:
+    """Gemini stand-in: `reply(prompt, batch)` returns the text or raises"""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.prompts = []
+
+    def generate_content(self, prompt, generation_config=None):
+        batch = generation_config is not None
+        self.prompts.append((prompt, batch))
+        return type('Response', (), {'text': self.reply(prompt, batch)})()
+
+
+@pytest.fixture
+def tool(monkeypatch):
+    monkeypatch.setattr(news_tool, 'CATEGORY_CACHE_PATH', '')
+    monkeypatch.setattr(news_tool, 'NEWS_QUOTA_PATH', '')
+    monkeypatch.setattr(news_tool, 'GEMINI_PER_MINUTE', 600)
+    tool = news_tool.NewsTool()
+    tool.categorizer_mode = 'gemini'
+    return tool
+
+
+def articles(count):
+    return [(f'Story number {n}', '') for n in range(count)]
+
+
+def numbered_answer(prompt, batch):
+    ids = re.findall(r'^(\d+)\. Title:', prompt, re.M)
+    return answer(*((int(number), 'Gaming') for number in ids)) if batch else 'Gaming'
+
+
+def test_large_backlogs_are_split_into_fixed_size_batches(tool, monkeypatch):
+    monkeypatch.setattr(news_tool, 'GEMINI_BATCH_SIZE', 25)
+    tool._gemini_model = model = ScriptedModel(numbered_answer)
+    assert tool.categorize_batch(articles(60)) == ['Gaming'] * 60
+    assert [len(re.findall(r'Title:', prompt)) for prompt, _ in model.prompts] == [25, 25, 10]
+
+
+def test_failed_batch_does_not_fan_out_into_single_requests(tool):
+    def server_error(prompt, batch):
+        raise RuntimeError('503 Service Unavailable')
+
+    tool._gemini_model = model = ScriptedModel(server_error)
+    assert tool.categorize_batch(articles(10)) == [None] * 10
+    assert len(model.prompts) == 1
+
+
+def test_unusable_answer_is_deferred_not_cached(tool):
+    tool._gemini_model = ScriptedModel(lambda prompt, batch: 'I am not sure')
+    story = Article('Story number 1', url='https://a.example/1', source='Wire', published=1_750_000_000)
+    tool.categorize_items([story])
+    assert story.key in tool._deferred
+    assert tool.category_cache.get(story.title, story.description) is None
+
+    tool._gemini_model = ScriptedModel(numbered_answer)
+    tool.categorize_items([story], retry_deferred=True)
+    assert story.category == 'Gaming'
+    assert story.key not in tool._deferred
@@ -0,0 +1,53 @@
+import metrics
+from category_cache import CategoryCache
+
+
+def test_hits_do_not_write_until_the_next_put(tmp_path):
+    cache = CategoryCache(str(tmp_path / 'categories.db'))
+    cache.put('Story', '', 'Gaming')
+    changes = cache._db().total_changes
+    for _ in range(10):
+        assert cache.get('Story') == 'Gaming'
+    assert cache._db().total_changes == changes
+
+
+def test_recently_hit_entries_survive_lru_eviction(tmp_path):
+    cache = CategoryCache(str(tmp_path / 'categories.db'), max_entries=2)
+    cache.put('Old but read', '', 'Gaming')
+    cache.put('Never read', '', 'Innovation')
+    cache.get('Old but read')
+    cache.put('New', '', 'Cybersecurity')
+
+    assert len(cache) == 2
+    assert cache.get('Never read') is None
+    assert cache.get('Old but read') == 'Gaming'
+
+
+def test_running_count_ignores_rewrites(tmp_path):
+    path = str(tmp_path / 'categories.db')
+    cache = CategoryCache(path)
+    cache.put('Story', '', 'Gaming')
+    cache.put('Story', '', 'Innovation')
+    assert len(cache) == 1
+    cache.close()
+    assert len(CategoryCache(path)) == 1
+
+
+def test_lookups_are_exported_as_metrics(tmp_path):
+    cache = CategoryCache(str(tmp_path / 'categories.db'))
+    hits = metrics.CATEGORY_CACHE_LOOKUPS.value(result='hit')
+    misses = metrics.CATEGORY_CACHE_LOOKUPS.value(result='miss')
+    cache.put('Story', '', 'Gaming')
+    cache.get('Story')
+    cache.get('Other story')
+    assert metrics.CATEGORY_CACHE_LOOKUPS.value(result='hit') == hits + 1
+    assert metrics.CATEGORY_CACHE_LOOKUPS.value(result='miss') == misses + 1
+
+
+def test_connection_is_not_reused_after_fork(tmp_path):
+    cache = CategoryCache(str(tmp_path / 'categories.db'))
+    cache.put('Story', '', 'Gaming')
+    inherited = cache._db()
+    cache._pid = -1  # as seen from a forked child
+    assert cache._db() is not inherited
+    assert cache.get('Story') == 'Gaming'
@@ -0,0 +1,95 @@
+import pytest
+
+from article import Article
+from dedup import StoryClusterer, key_terms, shingles
+from ingest import ArticleStore
+
+NOW = 1_750_000_000
+
+DIFFERENT_STORIES = [
+    ("Google Pixel 9 review: the best Android camera yet",
+     "Google Pixel 8 review: the best Android camera yet"),
+    ("OpenAI releases GPT-5 to all ChatGPT users",
+     "OpenAI releases GPT-4 to all ChatGPT users"),
+    ("Apple releases iOS 18.1 with new features",
+     "Apple releases iOS 18.2 with new features"),
+    ("Microsoft layoffs hit Xbox division",
+     "Microsoft layoffs hit Azure division"),
+    ("Apple announces new iPhone 16 with AI features",
+     "Apple announces new iPad Pro with AI features"),
+    ("Nvidia earnings beat expectations as data center sales soar",
+     "AMD earnings beat expectations as data center sales soar"),
+]
+
+SAME_STORIES = [
+    ("OpenAI releases GPT-5 to all ChatGPT users",
+     "OpenAI releases GPT-5 to all ChatGPT users - The Verge"),
+    ("Microsoft layoffs hit Xbox division hard",
+     "Microsoft layoffs hit Xbox division hard, report says"),
+]
+
+# The same story as worded by different outlets, in their own house styles
+CROSS_SOURCE_STORIES = [
+    ("OpenAI Launches GPT-5 For All ChatGPT Users",
+     "OpenAI Rolls Out GPT-5 To All ChatGPT Users"),
+    ("OpenAI launches GPT-5 for all ChatGPT users",
+     "OpenAI Rolls Out GPT-5 To All ChatGPT Users"),
+    ("Nvidia reports record quarterly revenue on AI chip demand",
+     "Nvidia posts record revenue as AI chip demand soars"),
+    ("Apple delays Siri AI overhaul to 2026",
+     "Apple Delays Its AI-Powered Siri Overhaul Until 2026"),
+    ("CrowdStrike update crashes Windows PCs worldwide",
+     "Faulty CrowdStrike Update Crashes Millions Of Windows PCs Worldwide"),
+    ("Ransomware gang claims breach of major hospital chain",
+     "Hospital chain confirms ransomware breach, gang claims responsibility"),
+]
+
+
+def article(title, source, published=NOW, description=''):
+    return Article(title, url=f'https://{source}.example/{abs(hash(title))}', source=source,
+                   published=published, description=description)
+
+
+@pytest.mark.parametrize('first, second', DIFFERENT_STORIES)
+def test_different_stories_stay_apart(first, second):
+    clusterer = StoryClusterer()
+    _, new_a = clusterer.add('a', article(first, 'wire'))
+    _, new_b = clusterer.add('b', article(second, 'blog'))
+    assert new_a and new_b
+
+
+@pytest.mark.parametrize('first, second', SAME_STORIES + CROSS_SOURCE_STORIES)
+def test_same_story_from_two_sources_merges(first, second):
+    clusterer = StoryClusterer()
+    cluster, _ = clusterer.add('a', article(first, 'wire'))
+    other, is_new = clusterer.add('b', article(second, 'blog'))
+    assert not is_new
+    assert other is cluster
+    assert cluster.sources == ['wire', 'blog']
+
+
+def test_same_headline_days_apart_is_a_new_story():
+    clusterer = StoryClusterer(window=48 * 3600)
+    title = "Microsoft layoffs hit Xbox division hard"
+    clusterer.add('a', article(title, 'wire'))
+    _, is_new = clusterer.add('b', article(title + ' again', 'blog', published=NOW + 5 * 86400))
+    assert is_new
+
+
+def test_shingles_keep_numbers():
+    assert '9' in shingles("Google Pixel 9 review")
+    assert shingles("Google Pixel 9 review") != shingles("Google Pixel 8 review")
+
+
+def test_title_case_words_are_not_key_terms():
+    assert key_terms("OpenAI Launches GPT-5 For All ChatGPT Users") == {'openai', 'gpt', '5', 'chatgpt'}
+    assert key_terms("Microsoft layoffs hit Xbox division") == {'microsoft', 'xbox'}
+    assert key_terms("Nvidia earnings beat expectations") == {'nvidia'}
+
+
+def test_store_keeps_both_different_stories():
+    store = ArticleStore()
+    first, second = DIFFERENT_STORIES[0]
+    new_items = store.ingest([article(first, 'wire'), article(second, 'blog')])
+    assert len(new_items) == 2
+    assert store.deduplicated == 0
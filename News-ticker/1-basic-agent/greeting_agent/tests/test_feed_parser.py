@@ -0,0 +1,29 @@
+import time
+
+import pytest
+
+from feed_parser import parse_fast, parse_with_feedparser
+
+UNDATED = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Wire</title>
+<item><title>Undated story</title><link>https://wire.example/1</link><guid>wire-1</guid></item>
+</channel></rss>"""
+
+MARKUP_TITLE = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Wire</title>
+<item><title><![CDATA[<b>AT&amp;T</b>   outage &#8211; what we know]]></title>
+<link>https://wire.example/2</link><pubDate>Mon, 02 Jun 2025 10:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+
+@pytest.mark.parametrize('parse', [parse_fast, parse_with_feedparser])
+def test_undated_entries_keep_their_first_seen_date(parse):
+    first = parse(UNDATED)
+    time.sleep(0.01)
+    again = parse(UNDATED, first_seen={entry[4]: entry[3] for entry in first})
+    assert again == first
+
+
+@pytest.mark.parametrize('parse', [parse_fast, parse_with_feedparser])
+def test_titles_are_plain_text_on_both_paths(parse):
+    assert parse(MARKUP_TITLE)[0][0] == 'AT&T outage – what we know'
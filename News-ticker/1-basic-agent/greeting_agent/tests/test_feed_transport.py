@@ -0,0 +1,94 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import news_tool
+from feed_transport import FeedTimeout, FeedTransport
+from sources import Source
+
+BODY = b'<rss version="2.0"><channel><title>Slow</title></channel></rss>'
+
+
+class Handler(BaseHTTPRequestHandler):
+    # Seconds between bytes of the body; 0 sends it all at once
+    trickle = 0
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml')
+        self.send_header('Content-Length', str(len(BODY)))
+        self.send_header('ETag', '"v1"')
+        self.end_headers()
+        try:
+            if not self.trickle:
+                self.wfile.write(BODY)
+                return
+            for i in range(len(BODY)):
+                self.wfile.write(BODY[i:i + 1])
+                self.wfile.flush()
+                time.sleep(self.trickle)
+        except OSError:
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+    Handler.trickle = 0
+
+
+def url(httpd):
+    return f'http://127.0.0.1:{httpd.server_address[1]}/feed'
+
+
+def test_get_reads_the_whole_body(server):
+    transport = FeedTransport()
+    response = transport.get(url(server), timeout=5)
+    assert response.status_code == 200
+    assert response.content == BODY
+    assert transport.stats()[url(server)]['bytes_downloaded'] == len(BODY)
+
+
+def test_trickling_body_is_cut_off_at_the_timeout(server):
+    # Every byte arrives well within a socket read timeout, the whole body does not
+    Handler.trickle = 0.05
+    transport = FeedTransport()
+    started = time.monotonic()
+    with pytest.raises(FeedTimeout):
+        transport.get(url(server), timeout=0.5)
+    assert time.monotonic() - started < 1.5
+    # Nothing from the abandoned download is kept
+    assert transport.stats() == {}
+    assert url(server) not in transport._validators
+
+
+def test_feeds_finishing_after_the_deadline_are_discarded(server, monkeypatch):
+    monkeypatch.setattr(news_tool, 'CATEGORY_CACHE_PATH', '')
+    monkeypatch.setattr(news_tool, 'NEWS_QUOTA_PATH', '')
+    tool = news_tool.NewsTool()
+    source = Source('slow', url(server))
+    stale = [('Old story', 'https://example.com/old', '', None, 'old')]
+    tool._feed_entries[source.url] = stale
+    get = tool.transport.get
+
+    def late_get(*args, **kwargs):
+        response = get(*args, **kwargs)
+        time.sleep(0.2)
+        return response
+
+    monkeypatch.setattr(tool.transport, 'get', late_get)
+    assert tool._fetch_feed_entries(source, deadline=time.monotonic() + 0.1) == []
+    # The entries served so far stay, and the next poll downloads in full
+    assert tool._feed_entries[source.url] is stale
+    assert source.url not in tool.transport._validators
@@ -0,0 +1,25 @@
+from article import Article
+from ingest import ArticleStore
+
+NOW = 1_750_000_000
+
+
+def test_retained_bytes_do_not_drift_when_sources_change():
+    store = ArticleStore(max_seen=3)
+    title = "Ransomware gang claims breach of major hospital chain"
+    store.ingest([Article(title, url='https://a.example/1', source='Wire', published=NOW)])
+    # The same story from other outlets grows the representative's sources after it was counted
+    store.ingest([Article(title + ' - ' + source, url=f'https://{source}.example/1', source=source,
+                          published=NOW) for source in ('Blog', 'Daily')])
+    assert store.merged
+    # Push everything out of the history
+    store.ingest([Article(f'Unrelated story number {n} about {topic}', url=f'https://b.example/{n}',
+                          published=NOW + n) for n, topic in enumerate(('chips', 'games', 'phones'))])
+    assert len(store) == 3
+    assert store.retained_bytes == sum(store._sizes.values())
+
+
+def test_size_counts_the_cached_json():
+    article = Article("Phishing campaign targets password managers", url='https://a.example/2',
+                      source='Wire', category='Cybersecurity', published=NOW)
+    assert article.size() > len(article.to_json())
@@ -0,0 +1,28 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from profiler import SamplingProfiler
+
+
+def spin(seconds=0.2):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_samples_pool_threads_started_during_the_profile():
+    stop = threading.Event()
+    idle = threading.Thread(target=stop.wait, name='idle-server', daemon=True)
+    idle.start()
+    try:
+        with SamplingProfiler() as profiler:
+            with ThreadPoolExecutor(max_workers=2, thread_name_prefix='rss-fetch') as pool:
+                list(pool.map(lambda _: spin(), range(2)))
+    finally:
+        stop.set()
+
+    roots = {stack.split(';', 1)[0] for stack in profiler.samples}
+    assert 'rss-fetch' in roots
+    assert 'idle-server' not in roots
+    assert profiler.top_functions(1)[0][0].startswith('spin ')
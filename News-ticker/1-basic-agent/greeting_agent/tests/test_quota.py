@@ -0,0 +1,32 @@
+from quota import QuotaLedger, UpstreamScheduler, VISIBLE
+
+
+def test_daily_budget_survives_a_restart(tmp_path):
+    path = str(tmp_path / 'quota.db')
+    first = UpstreamScheduler('NewsAPI', per_minute=600, daily_limit=3, ledger=QuotaLedger(path))
+    assert first.acquire(VISIBLE) and first.acquire(VISIBLE)
+
+    restarted = UpstreamScheduler('NewsAPI', per_minute=600, daily_limit=3, ledger=QuotaLedger(path))
+    assert restarted.to_dict()['used_today'] == 2
+    assert restarted.acquire(VISIBLE)
+    assert not restarted.acquire(VISIBLE)
+    assert not first.acquire(VISIBLE)
+
+
+def test_token_bucket_does_not_start_full_after_a_restart(tmp_path):
+    path = str(tmp_path / 'quota.db')
+    # One request a day's worth of tokens: the first call empties the bucket
+    first = UpstreamScheduler('NewsAPI', per_minute=100 / 1440, daily_limit=100, ledger=QuotaLedger(path))
+    assert first.acquire(VISIBLE)
+
+    restarted = UpstreamScheduler('NewsAPI', per_minute=100 / 1440, daily_limit=100, ledger=QuotaLedger(path))
+    assert not restarted.acquire(VISIBLE)
+
+
+def test_upstreams_are_budgeted_separately(tmp_path):
+    ledger = QuotaLedger(str(tmp_path / 'quota.db'))
+    newsapi = UpstreamScheduler('NewsAPI', per_minute=600, daily_limit=1, ledger=ledger)
+    gemini = UpstreamScheduler('Gemini', per_minute=600, daily_limit=1, ledger=ledger)
+    assert newsapi.acquire(VISIBLE)
+    assert gemini.acquire(VISIBLE)
+    assert not newsapi.acquire(VISIBLE)
@@ -0,0 +1,51 @@
+import time
+
+import pytest
+
+import news_tool
+from article import Article
+from ranking import KeywordRanker
+
+NOW = 1_750_000_000
+
+
+def story(title, description='', published=NOW):
+    return Article(title, url=f'https://a.example/{abs(hash(title))}', source='Wire',
+                   published=published, description=description)
+
+
+def test_keywords_match_whole_words_only():
+    ranker = KeywordRanker()
+    assert ranker.score(story("Company said email volumes rose")) == 0
+    assert ranker.score(story("OpenAI ships a new AI model")) == 2 * (3 + 2 + 2)
+
+
+def test_prefix_keywords_and_separators():
+    ranker = KeywordRanker()
+    # "gpt*" covers GPT-4o, "chatbot*" chatbots; "machine learning" survives odd spacing
+    assert ranker.score(story("GPT-4o chatbots", "machine  learning")) == 2 * (2 + 2) + 3
+
+
+def test_each_keyword_counts_once_per_field():
+    ranker = KeywordRanker()
+    assert ranker.score(story("AI, AI and more AI")) == 2 * 2
+
+
+@pytest.fixture
+def tool(monkeypatch):
+    monkeypatch.setattr(news_tool, 'CATEGORY_CACHE_PATH', '')
+    monkeypatch.setattr(news_tool, 'NEWS_QUOTA_PATH', '')
+    return news_tool.NewsTool()
+
+
+def test_agent_returns_only_ai_relevant_stories(tool):
+    stories = [story("Local bakery wins award", published=NOW + 10),
+               story("Anthropic releases a new Claude model", published=NOW)]
+    for item in stories:
+        item.score = tool.relevance.score(item)
+        item.set_category('Innovation')
+    tool.ranking = tool.ranker.rank(stories)
+    tool.ranked_at = time.time()
+
+    titles = [item['title'] for item in tool(None)]
+    assert titles == ["Anthropic releases a new Claude model"]
@@ -0,0 +1,63 @@
+import importlib
+
+import pytest
+
+from refresher import NewsRefresher, build_snapshot, event_id
+
+
+def refresher_with_two_versions():
+    refresher = NewsRefresher(tool=None, warm_start_path=None)
+    first = build_snapshot([{'title': 'a', 'url': 'https://a'}])
+    refresher._publish(first)
+    second = build_snapshot([{'title': 'b', 'url': 'https://b'}, {'title': 'a', 'url': 'https://a'}], first)
+    refresher._publish(second)
+    return refresher, first, second
+
+
+def test_known_event_id_gets_a_delta():
+    refresher, first, second = refresher_with_two_versions()
+    event, _ = refresher.stream_event(event_id(first), second)
+    assert event == 'delta'
+
+
+def test_id_from_another_boot_gets_a_snapshot():
+    refresher, first, second = refresher_with_two_versions()
+    # Same version number, different content: issued before a cold restart
+    event, _ = refresher.stream_event(f'{first.version}-{"0" * 16}', second)
+    assert event == 'snapshot'
+    assert refresher.wait_for_change(f'{second.version}-{"0" * 16}', timeout=0) is second
+
+
+def test_unknown_versions_share_one_cache_entry():
+    refresher, _, second = refresher_with_two_versions()
+    for value in ('17', '123-abc', 'junk', None, '999999-ffffffffffffffff'):
+        refresher.stream_event(value, second)
+    assert list(refresher._events) == [(None, second.version)]
+
+
+@pytest.fixture
+def web(monkeypatch):
+    for name in ('GOOGLE_API_KEY', 'NEWS_API_KEY', 'CATEGORY_CACHE_PATH', 'NEWS_QUOTA_PATH', 'NEWS_WARM_START_PATH'):
+        monkeypatch.setenv(name, '')
+    web = importlib.import_module('app')
+    monkeypatch.setattr(web.news_refresher, 'start', lambda: None)
+    monkeypatch.setattr(web, 'STREAM_MAX_AGE', 0.2)
+    monkeypatch.setattr(web, 'STREAM_MAX_CONNECTIONS', 1)
+    return web
+
+
+def test_streams_past_the_limit_are_refused_until_one_closes(web):
+    client = web.app.test_client()
+    first = client.get('/api/news/stream', buffered=False)
+    assert first.status_code == 200
+    assert client.get('/api/news/stream').status_code == 503
+    first.close()
+    assert web._open_streams == 0
+
+
+def test_stream_ends_after_max_age(web):
+    response = web.app.test_client().get('/api/news/stream')
+    assert response.status_code == 200
+    assert response.get_data(as_text=True).startswith('retry:')
+    response.close()
+    assert web._open_streams == 0
@@ -0,0 +1,38 @@
+import json
+
+from refresher import NewsRefresher
+
+
+class StubTool:
+    """Returns a fixed queue; `serving_fallback` says whether it is made up"""
+
+    def __init__(self, items, serving_fallback=False):
+        self.items = items
+        self.serving_fallback = serving_fallback
+
+    def execute(self):
+        return json.dumps(self.items)
+
+
+def test_restart_without_articles_keeps_the_warm_snapshot(tmp_path):
+    path = str(tmp_path / 'warm.json')
+    real = [{'id': '1', 'title': 'Real story', 'url': 'https://a.example/1'}]
+    NewsRefresher(StubTool(real), warm_start_path=path).refresh()
+    with open(path) as f:
+        saved = f.read()
+
+    # The first refresh after the restart gets nothing from upstream
+    fallback = [{'id': '1', 'title': 'Technology Update 1', 'url': ''}]
+    restarted = NewsRefresher(StubTool(fallback, serving_fallback=True), warm_start_path=path)
+    restarted.warm_start()
+    snapshot = restarted.refresh()
+
+    assert json.loads(snapshot.body) == real
+    with open(path) as f:
+        assert f.read() == saved
+
+
+def test_fallback_is_served_when_there_is_nothing_else():
+    fallback = [{'id': '1', 'title': 'Technology Update 1', 'url': ''}]
+    snapshot = NewsRefresher(StubTool(fallback, serving_fallback=True), warm_start_path=None).refresh()
+    assert json.loads(snapshot.body) == fallback